@@ -4,7 +4,9 @@ Type enhancer implementations for the type inference system.
 import re
 import logging
 from abc import ABC
+from collections import defaultdict
 from datetime import datetime
+from itertools import chain, islice
 from typing import Any, Dict, List, Optional, Pattern, Set, Tuple, Type, Union
 
 from src.format_detection.models import DataType, FieldInfo
@@ -20,6 +22,108 @@ from src.format_detection.type_inference.service import TypeEnhancer
 
 logger = logging.getLogger(__name__)
 
+# Characters allowed in UUID-like map keys
+_UUID_CHARS = frozenset("0123456789abcdefABCDEF-")
+
+# Patterns for map keys accepted by int() and float(): surrounding whitespace
+# (which for them excludes the \x1c-\x1f separators), an optional sign,
+# underscores between digits, and nan/inf/infinity for float
+_SPACE = r"[^\S\x1c-\x1f]*"
+_DIGITS = r"\d+(?:_\d+)*"
+_INT_RE = re.compile(rf"{_SPACE}[-+]?{_DIGITS}{_SPACE}")
+_FLOAT_RE = re.compile(
+    rf"{_SPACE}[-+]?(?:(?:{_DIGITS}(?:\.(?:{_DIGITS})?)?|\.{_DIGITS})(?:[eE][-+]?{_DIGITS})?"
+    rf"|[nN][aA][nN]|[iI][nN][fF](?:[iI][nN][iI][tT][yY])?){_SPACE}"
+)
+
+# Data types for map keys that follow a recognizable pattern
+_MAP_KEY_TYPES = {
+    "int": DataType.INTEGER,
+    "float": DataType.FLOAT,
+    "uuid": DataType.STRING,
+}
+
+# Maximum number of non-null sample values used to infer an item type
+_TYPE_SAMPLE_CAP = 128
+
+# Data types for Python value types (bool must precede int for subclass checks)
+_PYTHON_VALUE_TYPES = {
+    str: DataType.STRING,
+    bool: DataType.BOOLEAN,
+    int: DataType.INTEGER,
+    float: DataType.FLOAT,
+    list: DataType.ARRAY,
+    dict: DataType.OBJECT,
+}
+
+
+def _subclass_data_type(value_type: type) -> DataType:
+    """
+    Get the data type for a subclass of a supported Python value type.
+    
+    Args:
+        value_type: Python type not found in _PYTHON_VALUE_TYPES.
+        
+    Returns:
+        DataType: Data type of the first matching base type, or UNKNOWN.
+    """
+    for py_type, data_type in _PYTHON_VALUE_TYPES.items():
+        if issubclass(value_type, py_type):
+            return data_type
+    return DataType.UNKNOWN
+
+
+def _is_uuid(name: str) -> bool:
+    """
+    Check if a name is a UUID in 8-4-4-4-12 hex digit form.
+    
+    Args:
+        name: Name to check.
+        
+    Returns:
+        bool: True if the name is a UUID.
+    """
+    return (
+        len(name) == 36
+        and name[8] == name[13] == name[18] == name[23] == "-"
+        and name.count("-") == 4
+        and _UUID_CHARS.issuperset(name)
+    )
+
+
+def _classify_map_key(name: str) -> str:
+    """
+    Classify a property name as a potential map key.
+    
+    Uses patterns matching what int()/float() accept rather than their exceptions.
+    
+    Args:
+        name: Property name.
+        
+    Returns:
+        str: "int", "float", "uuid" or "string".
+    """
+    if _INT_RE.fullmatch(name):
+        return "int"
+    if _FLOAT_RE.fullmatch(name):
+        return "float"
+    if _is_uuid(name):
+        return "uuid"
+    return "string"
+
+
+# Value type template for maps without sample values (copy before use)
+_UNKNOWN_VALUE_TYPE = EnhancedTypeInfo(
+    primary_type=DataType.UNKNOWN,
+    confidence=TypeConfidence(
+        score=0.5,
+        factors={"default": 0.5},
+        rationale="No sample values available",
+        detection_method="complex_structure_analysis",
+    ),
+    is_nullable=True,
+)
+
 
 class NameBasedEnhancer(TypeEnhancer):
     """Enhances type information based on field names."""
@@ -76,10 +180,15 @@ class NameBasedEnhancer(TypeEnhancer):
         """Initialize the name-based enhancer."""
         # Compile patterns for efficiency
         self.compiled_patterns = {}
+        # One alternation per type to skip types whose patterns cannot match
+        self.combined_patterns = {}
         for type_key, patterns in self.NAME_PATTERNS.items():
             self.compiled_patterns[type_key] = [
                 re.compile(pattern, re.IGNORECASE) for pattern in patterns
             ]
+            self.combined_patterns[type_key] = re.compile(
+                "|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE
+            )
     
     def enhance_type(self, field_info: FieldInfo, context: Dict[str, Any]) -> EnhancedTypeInfo:
         """
@@ -99,65 +208,111 @@ class NameBasedEnhancer(TypeEnhancer):
         # Get lowercase field name for matching
         field_name = field_info.name.lower()
         
-        # Check for named patterns
-        for type_key, compiled_patterns in self.compiled_patterns.items():
-            for pattern in compiled_patterns:
-                if pattern.match(field_name):
-                    confidence_boost = 0.2
-                    rationale = f"Field name '{field_info.name}' matches pattern for {type_key}"
-                    logger.debug(rationale)
+        # Use name matches shared across a batch when available
+        type_keys = context.get('_name_matches', {}).get(field_name)
+        if type_keys is None:
+            type_keys = self._match_name(field_name)
+        
+        # Apply each matching named pattern
+        for type_key in type_keys:
+            confidence_boost = 0.2
+            rationale = f"Field name '{field_info.name}' matches pattern for {type_key}"
+            logger.debug(rationale)
+            
+            # If this is a special ID pattern, add ID pattern but keep string type
+            if type_key == "id":
+                current_type.patterns.append(TypePattern.ID)
+                current_type.confidence.factors["id_name_pattern"] = confidence_boost
+                current_type.confidence.rationale += f". {rationale}"
+                continue
+                
+            # If inferred type differs from current, add as alternative or adjust primary
+            try:
+                inferred_type = DataType(type_key)
+                
+                if inferred_type != current_type.primary_type:
+                    # Different from current - consider if we should change primary
                     
-                    # If this is a special ID pattern, add ID pattern but keep string type
-                    if type_key == "id":
-                        current_type.patterns.append(TypePattern.ID)
-                        current_type.confidence.factors["id_name_pattern"] = confidence_boost
-                        current_type.confidence.rationale += f". {rationale}"
-                        break
-                        
-                    # If inferred type differs from current, add as alternative or adjust primary
-                    try:
-                        inferred_type = DataType(type_key)
-                        
-                        if inferred_type != current_type.primary_type:
-                            # Different from current - consider if we should change primary
-                            
-                            # Special handling for datetime vs date
-                            if current_type.primary_type == DataType.STRING:
-                                # String can be easily reinterpreted as another type
-                                if inferred_type in (DataType.DATE, DataType.DATETIME):
-                                    # Add as pattern first, don't change type immediately
-                                    if inferred_type == DataType.DATE:
-                                        current_type.patterns.append(TypePattern.DATE)
-                                    else:
-                                        current_type.patterns.append(TypePattern.DATETIME)
-                                    
-                                    # Add suggestion that this might be a date/datetime
-                                    self._add_alternative(current_type, inferred_type, 
-                                                     confidence_boost, rationale)
-                                else:
-                                    # For other string reconsideration
-                                    self._add_alternative(current_type, inferred_type, 
-                                                     confidence_boost, rationale)
-                                    
-                            elif inferred_type == DataType.ARRAY and field_name.endswith("s"):
-                                # Plural field names suggest arrays, but don't change type outright
-                                self._add_alternative(current_type, inferred_type, 
-                                                 confidence_boost, rationale)
+                    # Special handling for datetime vs date
+                    if current_type.primary_type == DataType.STRING:
+                        # String can be easily reinterpreted as another type
+                        if inferred_type in (DataType.DATE, DataType.DATETIME):
+                            # Add as pattern first, don't change type immediately
+                            if inferred_type == DataType.DATE:
+                                current_type.patterns.append(TypePattern.DATE)
                             else:
-                                # For other type conflicts, add as alternative
-                                self._add_alternative(current_type, inferred_type, 
-                                                 confidence_boost * 0.5, rationale)
+                                current_type.patterns.append(TypePattern.DATETIME)
+                            
+                            # Add suggestion that this might be a date/datetime
+                            self._add_alternative(current_type, inferred_type, 
+                                             confidence_boost, rationale)
                         else:
-                            # Same as current type, boost confidence
-                            current_type.confidence.factors["name_pattern_match"] = confidence_boost
-                            current_type.confidence.rationale += f". {rationale}"
+                            # For other string reconsideration
+                            self._add_alternative(current_type, inferred_type, 
+                                             confidence_boost, rationale)
                             
-                    except ValueError:
-                        # Not a standard DataType
-                        pass
+                    elif inferred_type == DataType.ARRAY and field_name.endswith("s"):
+                        # Plural field names suggest arrays, but don't change type outright
+                        self._add_alternative(current_type, inferred_type, 
+                                         confidence_boost, rationale)
+                    else:
+                        # For other type conflicts, add as alternative
+                        self._add_alternative(current_type, inferred_type, 
+                                         confidence_boost * 0.5, rationale)
+                else:
+                    # Same as current type, boost confidence
+                    current_type.confidence.factors["name_pattern_match"] = confidence_boost
+                    current_type.confidence.rationale += f". {rationale}"
+                    
+            except ValueError:
+                # Not a standard DataType
+                pass
                         
         return current_type
 
+    def enhance_batch(self, fields: List[FieldInfo], context: Dict[str, Any],
+                      current_types: List[EnhancedTypeInfo]) -> List[EnhancedTypeInfo]:
+        """
+        Enhance type information for a batch of fields based on field names.
+        
+        Each distinct field name is matched against the name patterns once.
+        
+        Args:
+            fields: Field information for each field in the batch.
+            context: Schema-wide context for type inference.
+            current_types: Current type information for each field.
+            
+        Returns:
+            List[EnhancedTypeInfo]: Enhanced type information for each field.
+        """
+        field_names = {field_info.name.lower() for field_info in fields}
+        name_matches = {name: self._match_name(name) for name in field_names}
+        return super().enhance_batch(
+            fields, {**context, '_name_matches': name_matches}, current_types
+        )
+
+    def _match_name(self, field_name: str) -> List[Any]:
+        """
+        Match a lowercase field name against the name patterns.
+        
+        Args:
+            field_name: Lowercase field name.
+            
+        Returns:
+            List[Any]: Type key for each matching pattern, in pattern order
+                (the ID type key is included at most once).
+        """
+        type_keys = []
+        for type_key, compiled_patterns in self.compiled_patterns.items():
+            if not self.combined_patterns[type_key].match(field_name):
+                continue
+            for pattern in compiled_patterns:
+                if pattern.match(field_name):
+                    type_keys.append(type_key)
+                    if type_key == "id":
+                        break
+        return type_keys
+
     def _add_alternative(self, current_type: EnhancedTypeInfo, 
                         alternative_type: DataType, 
                         confidence: float, 
@@ -614,22 +769,9 @@ class ComplexStructureEnhancer(TypeEnhancer):
 
         if not item_values:
             return current_type
-            
-        # Create a synthetic FieldInfo for array items
-        item_field = FieldInfo(
-            name=f"{field_info.name}_item",
-            path=f"{field_info.path}.item",
-            data_type=self._infer_item_type(item_values),
-            nullable=any(v is None for v in item_values),
-            description=None,
-            constraints=[],
-            metadata={},
-            sample_values=item_values,
-            statistics=None,
-        )
         
-        # Create empty context for item type inference
-        item_context = {'field_path': item_field.path}
+        # Infer item type directly from the sampled items
+        data_type, has_null = self._classify_values(item_values)
         
         # Create base type info for array items
         item_confidence = TypeConfidence(
@@ -640,15 +782,9 @@ class ComplexStructureEnhancer(TypeEnhancer):
         )
         
         item_type = EnhancedTypeInfo(
-            primary_type=item_field.data_type,
-            secondary_types=[],
-            format_specific_type=None,
-            constraints=[],
-            patterns=[],
+            primary_type=data_type,
             confidence=item_confidence,
-            possible_alternatives=[],
-            is_nullable=item_field.nullable,
-            metadata={},
+            is_nullable=has_null,
         )
         
         # Set item_type in current_type
@@ -680,12 +816,10 @@ class ComplexStructureEnhancer(TypeEnhancer):
         sample_values = field_info.sample_values
         
         # Extract object properties for analysis
-        property_map = {}
+        property_map: Dict[str, List[Any]] = defaultdict(list)
         for sample in sample_values:
             if isinstance(sample, dict):
                 for key, value in sample.items():
-                    if key not in property_map:
-                        property_map[key] = []
                     property_map[key].append(value)
         
         if not property_map:
@@ -696,18 +830,8 @@ class ComplexStructureEnhancer(TypeEnhancer):
         
         # Process each property
         for prop_name, prop_values in property_map.items():
-            # Create a synthetic FieldInfo for property
-            prop_field = FieldInfo(
-                name=prop_name,
-                path=f"{field_info.path}.{prop_name}",
-                data_type=self._infer_item_type(prop_values),
-                nullable=any(v is None for v in prop_values),
-                description=None,
-                constraints=[],
-                metadata={},
-                sample_values=prop_values,
-                statistics=None,
-            )
+            # Infer property type directly from its sampled values
+            data_type, has_null = self._classify_values(prop_values)
             
             # Create base type info for property
             prop_confidence = TypeConfidence(
@@ -718,15 +842,9 @@ class ComplexStructureEnhancer(TypeEnhancer):
             )
             
             prop_type = EnhancedTypeInfo(
-                primary_type=prop_field.data_type,
-                secondary_types=[],
-                format_specific_type=None,
-                constraints=[],
-                patterns=[],
+                primary_type=data_type,
                 confidence=prop_confidence,
-                possible_alternatives=[],
-                is_nullable=prop_field.nullable,
-                metadata={},
+                is_nullable=has_null,
             )
             
             # Add property type to object properties
@@ -734,37 +852,19 @@ class ComplexStructureEnhancer(TypeEnhancer):
         
         # Check if this might be a map/dictionary type
         if len(property_map) >= 5:
-            # Look for patterns in property names
-            prop_name_types = set()
-            for name in property_map.keys():
-                try:
-                    # Try to parse as a number
-                    int(name)
-                    prop_name_types.add("int")
-                except ValueError:
-                    try:
-                        float(name)
-                        prop_name_types.add("float")
-                    except ValueError:
-                        # Check for UUID pattern
-                        uuid_pattern = re.compile(
-                            r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$",
-                            re.IGNORECASE
-                        )
-                        if uuid_pattern.match(name):
-                            prop_name_types.add("uuid")
-                        else:
-                            prop_name_types.add("string")
-            
-            # If property names are all the same type (and not just 'string'), this might be a map
-            if len(prop_name_types) == 1 and next(iter(prop_name_types)) != "string":
-                key_type_str = next(iter(prop_name_types))
-                key_type_map = {
-                    "int": DataType.INTEGER,
-                    "float": DataType.FLOAT,
-                    "uuid": DataType.STRING
-                }
+            # Look for a single non-string pattern shared by all property names
+            key_type_str = None
+            for name in property_map:
+                key_kind = _classify_map_key(name)
                 
+                # Plain or mixed key types can never form a map, stop early
+                if key_kind == "string" or key_type_str not in (None, key_kind):
+                    key_type_str = None
+                    break
+                key_type_str = key_kind
+            
+            # If property names are all the same non-string type, this might be a map
+            if key_type_str is not None:
                 # Create key type information
                 key_confidence = TypeConfidence(
                     score=0.7,
@@ -774,15 +874,10 @@ class ComplexStructureEnhancer(TypeEnhancer):
                 )
                 
                 key_type = EnhancedTypeInfo(
-                    primary_type=key_type_map.get(key_type_str, DataType.STRING),
-                    secondary_types=[],
-                    format_specific_type=None,
-                    constraints=[],
+                    primary_type=_MAP_KEY_TYPES[key_type_str],
                     patterns=[TypePattern.UUID] if key_type_str == "uuid" else [],
                     confidence=key_confidence,
-                    possible_alternatives=[],
                     is_nullable=False,
-                    metadata={},
                 )
                 
                 # Find most common value type
@@ -792,8 +887,9 @@ class ComplexStructureEnhancer(TypeEnhancer):
                 current_type.key_type = key_type
                 current_type.value_type = value_type
                 current_type.metadata["potential_map"] = True
-                current_type.confidence.factors["map_structure"] = 0.2
-                current_type.confidence.rationale += ". Object structure suggests a map/dictionary"
+                confidence = current_type.confidence
+                confidence.factors["map_structure"] = 0.2
+                confidence.rationale += ". Object structure suggests a map/dictionary"
         
         return current_type
     
@@ -807,88 +903,87 @@ class ComplexStructureEnhancer(TypeEnhancer):
         Returns:
             DataType: Inferred data type.
         """
-        if not values or all(v is None for v in values):
-            return DataType.UNKNOWN
-        
-        # Get non-null values for type detection
-        non_null = [v for v in values if v is not None]
-        if not non_null:
-            return DataType.UNKNOWN
+        return self._classify_values(values)[0]
+    
+    def _classify_values(self, values: List[Any]) -> Tuple[DataType, bool]:
+        """
+        Infer data type from a list of values and check them for nulls.
         
-        types = {type(v) for v in non_null}
+        Only the first _TYPE_SAMPLE_CAP non-null values are used for type
+        detection; nullability is checked over all values.
         
-        # All values are of the same type
-        if len(types) == 1:
-            value_type = next(iter(types))
+        Args:
+            values: List of values to analyze.
             
-            if issubclass(value_type, str):
-                return DataType.STRING
-            elif issubclass(value_type, bool):
-                return DataType.BOOLEAN
-            elif issubclass(value_type, int):
-                return DataType.INTEGER
-            elif issubclass(value_type, float):
-                return DataType.FLOAT
-            elif issubclass(value_type, list):
-                return DataType.ARRAY
-            elif issubclass(value_type, dict):
-                return DataType.OBJECT
-            else:
-                return DataType.UNKNOWN
+        Returns:
+            Tuple[DataType, bool]: Inferred data type and whether any value is null.
+        """
+        # Get the first non-null values for type detection
+        non_null = list(islice((v for v in values if v is not None), _TYPE_SAMPLE_CAP))
+        if len(non_null) < _TYPE_SAMPLE_CAP:
+            has_null = len(non_null) < len(values)
+        else:
+            has_null = None in values
+        if not non_null:
+            return DataType.UNKNOWN, has_null
         
-        # Mixed types - determine most appropriate general type
-        type_counts = {
-            DataType.STRING: sum(1 for v in non_null if isinstance(v, str)),
-            DataType.BOOLEAN: sum(1 for v in non_null if isinstance(v, bool)),
-            DataType.INTEGER: sum(1 for v in non_null if isinstance(v, int) and not isinstance(v, bool)),
-            DataType.FLOAT: sum(1 for v in non_null if isinstance(v, float)),
-            DataType.ARRAY: sum(1 for v in non_null if isinstance(v, list)),
-            DataType.OBJECT: sum(1 for v in non_null if isinstance(v, dict)),
-        }
+        # All values are of the same type (stop at the first different one)
+        value_type = type(non_null[0])
+        for v in non_null:
+            if type(v) is not value_type:
+                break
+        else:
+            return _PYTHON_VALUE_TYPES.get(value_type) or _subclass_data_type(value_type), has_null
         
-        # Get type with most instances
-        most_common_type = max(type_counts.items(), key=lambda x: x[1])
+        # Mixed types - count instances of each data type in a single pass
+        type_counts = dict.fromkeys(_PYTHON_VALUE_TYPES.values(), 0)
+        for v in non_null:
+            data_type = _PYTHON_VALUE_TYPES.get(type(v)) or _subclass_data_type(type(v))
+            if data_type is not DataType.UNKNOWN:
+                type_counts[data_type] += 1
         
         # If there's a mix of integers and floats, prefer float
         if type_counts[DataType.INTEGER] > 0 and type_counts[DataType.FLOAT] > 0:
-            return DataType.FLOAT
+            return DataType.FLOAT, has_null
         
-        # Otherwise return the most common type
-        return most_common_type[0]
+        # Otherwise return the type with most instances (first one wins ties)
+        most_common_type = DataType.UNKNOWN
+        most_common_count = -1
+        for data_type, count in type_counts.items():
+            if count > most_common_count:
+                most_common_type = data_type
+                most_common_count = count
+        
+        return most_common_type, has_null
     
     def _get_common_value_type(self, value_lists: List[List[Any]]) -> EnhancedTypeInfo:
         """
         Get the most common type from lists of values.
         
+        Only the first _TYPE_SAMPLE_CAP non-null values are used for type
+        detection.
+        
         Args:
             value_lists: Lists of values to analyze.
             
         Returns:
             EnhancedTypeInfo: Common type information.
         """
-        # Flatten value lists
-        all_values = [v for sublist in value_lists for v in sublist if v is not None]
+        # Flatten value lists, keeping the first non-null values for type detection
+        total_values = sum(len(sublist) for sublist in value_lists)
+        all_values = list(islice(
+            (v for v in chain.from_iterable(value_lists) if v is not None),
+            _TYPE_SAMPLE_CAP
+        ))
+        if len(all_values) < _TYPE_SAMPLE_CAP:
+            # Every non-null value was kept, so any dropped values were nulls
+            has_null = len(all_values) < total_values
+        else:
+            has_null = any(None in sublist for sublist in value_lists)
         
         if not all_values:
             # Default to unknown if no values
-            value_confidence = TypeConfidence(
-                score=0.5,
-                factors={"default": 0.5},
-                rationale="No sample values available",
-                detection_method="complex_structure_analysis",
-            )
-            
-            return EnhancedTypeInfo(
-                primary_type=DataType.UNKNOWN,
-                secondary_types=[],
-                format_specific_type=None,
-                constraints=[],
-                patterns=[],
-                confidence=value_confidence,
-                possible_alternatives=[],
-                is_nullable=True,
-                metadata={},
-            )
+            return _UNKNOWN_VALUE_TYPE.model_copy(deep=True)
         
         # Infer common type
         common_type = self._infer_item_type(all_values)
@@ -903,14 +998,8 @@ class ComplexStructureEnhancer(TypeEnhancer):
         
         value_type = EnhancedTypeInfo(
             primary_type=common_type,
-            secondary_types=[],
-            format_specific_type=None,
-            constraints=[],
-            patterns=[],
             confidence=value_confidence,
-            possible_alternatives=[],
-            is_nullable=any(v is None for sublist in value_lists for v in sublist),
-            metadata={},
+            is_nullable=has_null,
         )
         
         return value_type
@@ -2,7 +2,8 @@
 Integration between type inference system and format detection service.
 """
 import logging
-from typing import Dict, Any, List, Optional
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional
 
 from src.format_detection.models import SchemaDetails, FormatType
 from src.format_detection.type_inference.service import TypeInferenceService
@@ -10,6 +11,71 @@ from src.format_detection.type_inference.service import TypeInferenceService
 logger = logging.getLogger(__name__)
 
 
+# Format-specific context for type inference, keyed by format type.
+# This can be extended with format-specific information, for example
+# known type patterns or conventions of a format.
+_FORMAT_CONTEXTS: Dict[FormatType, Mapping[str, Any]] = {
+    FormatType.JSON: MappingProxyType({
+        'allows_mixed_types_in_arrays': True,
+        'typical_id_field': 'id',
+        'number_handling': 'native',
+    }),
+    FormatType.CSV: MappingProxyType({
+        'column_based': True,
+        'uniform_types': True,
+        'first_row_header': True,
+    }),
+    FormatType.SQL: MappingProxyType({
+        'strict_types': True,
+        'supports_constraints': True,
+        'primary_key_convention': 'id',
+    }),
+    FormatType.PROTOBUF: MappingProxyType({
+        'strict_types': True,
+        'supports_nested_types': True,
+        'supports_unions': False,
+        'common_conventions': MappingProxyType({
+            'timestamp': 'google.protobuf.Timestamp',
+            'nullable': 'google.protobuf.StringValue',
+        }),
+    }),
+    FormatType.GRAPHQL: MappingProxyType({
+        'supports_interfaces': True,
+        'supports_unions': True,
+        'supports_scalars': True,
+        'common_conventions': MappingProxyType({
+            'id': 'ID',
+            'timestamp': 'DateTime',
+        }),
+    }),
+    # Add more format-specific contexts as needed
+}
+
+# Shared context for formats without specific information
+_EMPTY_FORMAT_CONTEXT: Mapping[str, Any] = MappingProxyType({})
+
+
+def _format_specific_context(format_id: str) -> Mapping[str, Any]:
+    """
+    Build format-specific context information for type inference.
+    
+    The returned mappings are shared across calls and read-only.
+    
+    Args:
+        format_id: Format identifier.
+        
+    Returns:
+        Mapping[str, Any]: Read-only format-specific context.
+    """
+    try:
+        format_type = FormatType(format_id)
+    except ValueError:
+        logger.warning("Unknown format ID: %s", format_id)
+        return _EMPTY_FORMAT_CONTEXT
+    
+    return _FORMAT_CONTEXTS.get(format_type, _EMPTY_FORMAT_CONTEXT)
+
+
 class TypeInferenceIntegration:
     """
     Integration between format detection service and type inference system.
@@ -57,7 +123,7 @@ class TypeInferenceIntegration:
         
         return enhanced_schema
     
-    def _get_format_specific_context(self, format_id: str) -> Dict[str, Any]:
+    def _get_format_specific_context(self, format_id: str) -> Mapping[str, Any]:
         """
         Get format-specific context information for type inference.
         
@@ -65,58 +131,6 @@ class TypeInferenceIntegration:
             format_id: Format identifier.
             
         Returns:
-            Dict[str, Any]: Format-specific context.
+            Mapping[str, Any]: Read-only format-specific context.
         """
-        # This can be extended with format-specific information
-        # For example, certain formats might have known type patterns or conventions
-        
-        format_context = {}
-        
-        try:
-            format_type = FormatType(format_id)
-            
-            # Add format-specific context based on format type
-            if format_type == FormatType.JSON:
-                format_context = {
-                    'allows_mixed_types_in_arrays': True,
-                    'typical_id_field': 'id',
-                    'number_handling': 'native',
-                }
-            elif format_type == FormatType.CSV:
-                format_context = {
-                    'column_based': True,
-                    'uniform_types': True,
-                    'first_row_header': True,
-                }
-            elif format_type == FormatType.SQL:
-                format_context = {
-                    'strict_types': True,
-                    'supports_constraints': True,
-                    'primary_key_convention': 'id',
-                }
-            elif format_type == FormatType.PROTOBUF:
-                format_context = {
-                    'strict_types': True,
-                    'supports_nested_types': True,
-                    'supports_unions': False,
-                    'common_conventions': {
-                        'timestamp': 'google.protobuf.Timestamp',
-                        'nullable': 'google.protobuf.StringValue',
-                    }
-                }
-            elif format_type == FormatType.GRAPHQL:
-                format_context = {
-                    'supports_interfaces': True,
-                    'supports_unions': True,
-                    'supports_scalars': True,
-                    'common_conventions': {
-                        'id': 'ID',
-                        'timestamp': 'DateTime',
-                    }
-                }
-            # Add more format-specific contexts as needed
-            
-        except ValueError:
-            logger.warning("Unknown format ID: %s", format_id)
-        
-        return format_context
+        return _format_specific_context(format_id)
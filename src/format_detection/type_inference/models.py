@@ -84,7 +84,7 @@ class EnhancedTypeInfo(BaseModel):
 
 
 # Add self-reference for recursive types
-EnhancedTypeInfo.update_forward_refs()
+EnhancedTypeInfo.model_rebuild()
 
 
 class NormalizedType(BaseModel):
@@ -105,4 +105,4 @@ class NormalizedType(BaseModel):
 
 
 # Add self-reference for recursive types
-NormalizedType.update_forward_refs()
+NormalizedType.model_rebuild()
@@ -1,9 +1,12 @@
 """
 Service for enhanced type inference operations.
 """
+import bisect
 import logging
 import re
 from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Set, Tuple, Type, Union
 
 from src.format_detection.models import DataType, FieldInfo, SchemaDetails
@@ -19,6 +22,12 @@ from src.format_detection.type_inference.models import (
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of field signatures kept in the inference cache
+INFERENCE_CACHE_SIZE = 1024
+
+# Type patterns by their string value
+_PATTERNS_BY_VALUE: Dict[str, TypePattern] = {p.value: p for p in TypePattern}
+
 
 class TypeEnhancer(ABC):
     """Abstract base class for type enhancers."""
@@ -28,6 +37,10 @@ class TypeEnhancer(ABC):
         """
         Enhance type information for a field.
         
+        The context dict is shared by every enhancer applied to a field,
+        with 'current_type' updated between enhancers, so enhancers must
+        treat it as read-only.
+        
         Args:
             field_info: Field information.
             context: Additional context for type inference.
@@ -37,6 +50,40 @@ class TypeEnhancer(ABC):
         """
         pass
     
+    def enhance_batch(self, fields: List[FieldInfo], context: Dict[str, Any],
+                      current_types: List[EnhancedTypeInfo]) -> List[EnhancedTypeInfo]:
+        """
+        Enhance type information for a batch of fields.
+        
+        The default implementation applies enhance_type to each field.
+        Enhancers can override this to share setup work across the batch.
+        
+        Args:
+            fields: Field information for each field in the batch.
+            context: Schema-wide context for type inference.
+            current_types: Current type information for each field.
+            
+        Returns:
+            List[EnhancedTypeInfo]: Enhanced type information for each field.
+        """
+        enhanced_types = []
+        field_context = dict(context)
+        
+        for field_info, current_type in zip(fields, current_types):
+            field_context['field_path'] = field_info.path
+            field_context['nullable'] = field_info.nullable
+            field_context['sample_values'] = field_info.sample_values
+            field_context['statistics'] = field_info.statistics or {}
+            field_context['current_type'] = current_type
+            try:
+                current_type = self.enhance_type(field_info, field_context)
+            except Exception as e:
+                logger.warning("Enhancer %s failed for field %s: %s", 
+                              self.__class__.__name__, field_info.path, str(e))
+            enhanced_types.append(current_type)
+        
+        return enhanced_types
+    
     @abstractmethod
     def get_priority(self) -> int:
         """
@@ -48,30 +95,50 @@ class TypeEnhancer(ABC):
         pass
 
 
+@lru_cache(maxsize=1)
+def _default_enhancers() -> Tuple[TypeEnhancer, ...]:
+    """
+    Get the built-in type enhancers shared by all service instances.
+    
+    The built-in enhancers keep no per-field state, so a single instance of
+    each (with its compiled patterns) can be reused.
+    
+    Returns:
+        Tuple[TypeEnhancer, ...]: Built-in type enhancers.
+    """
+    from src.format_detection.type_inference.enhancers import (
+        NameBasedEnhancer,
+        PatternBasedEnhancer,
+        ConstraintBasedEnhancer,
+        ComplexStructureEnhancer,
+    )
+    
+    return (
+        NameBasedEnhancer(),
+        PatternBasedEnhancer(),
+        ConstraintBasedEnhancer(),
+        ComplexStructureEnhancer(),
+    )
+
+
 class TypeInferenceService:
     """Service for enhanced type inference operations."""
     
     def __init__(self):
         """Initialize the type inference service."""
         self.enhancers: List[TypeEnhancer] = []
+        self._enhancer_priorities: List[int] = []
+        self._enhancer_chain: Tuple[Tuple[str, Any], ...] = ()
+        self._inference_cache: "OrderedDict[Tuple, EnhancedTypeInfo]" = OrderedDict()
         self._register_enhancers()
         logger.info("Initialized type inference service with %d enhancers", len(self.enhancers))
     
     def _register_enhancers(self):
         """Register built-in type enhancers."""
-        from src.format_detection.type_inference.enhancers import (
-            NameBasedEnhancer,
-            PatternBasedEnhancer,
-            ConstraintBasedEnhancer,
-            ComplexStructureEnhancer,
-        )
-        
         # Register enhancers in order of increasing priority
-        # (they will be sorted by priority later)
-        self.register_enhancer(NameBasedEnhancer())
-        self.register_enhancer(PatternBasedEnhancer())
-        self.register_enhancer(ConstraintBasedEnhancer())
-        self.register_enhancer(ComplexStructureEnhancer())
+        # (they are inserted by priority on registration)
+        for enhancer in _default_enhancers():
+            self.register_enhancer(enhancer)
         
         logger.info("Registered %d built-in type enhancers", len(self.enhancers))
     
@@ -82,18 +149,29 @@ class TypeInferenceService:
         Args:
             enhancer: Type enhancer instance.
         """
-        self.enhancers.append(enhancer)
-        # Sort enhancers by priority (ascending)
-        self.enhancers.sort(key=lambda e: e.get_priority())
+        # Insert in priority order (ascending, stable for equal priorities)
+        priority = enhancer.get_priority()
+        index = bisect.bisect_right(self._enhancer_priorities, priority)
+        self._enhancer_priorities.insert(index, priority)
+        self.enhancers.insert(index, enhancer)
+        # Bind enhancer names and methods once for the inference loop
+        self._enhancer_chain = tuple(
+            (e.__class__.__name__, e.enhance_type) for e in self.enhancers
+        )
+        # Cached results were produced by the previous enhancer chain
+        self.clear_cache()
         logger.debug("Registered enhancer: %s (priority: %d)", 
-                    enhancer.__class__.__name__, enhancer.get_priority())
+                    enhancer.__class__.__name__, priority)
     
-    def enhance_schema(self, schema: SchemaDetails) -> SchemaDetails:
+    def enhance_schema(self, schema: SchemaDetails, in_place: bool = False) -> SchemaDetails:
         """
         Enhance type information in a schema.
         
         Args:
             schema: Schema details.
+            in_place: Whether to replace the fields and metadata of the given
+                schema instead of returning an enhanced copy. Each original
+                field is released as soon as its enhanced copy is stored.
             
         Returns:
             SchemaDetails: Enhanced schema details.
@@ -108,43 +186,37 @@ class TypeInferenceService:
             'unique_constraints': schema.unique_constraints,
         }
         
-        # Enhance each field
-        enhanced_fields = []
+        # Enhance all fields as a single batch
+        enhanced_types = self._infer_field_types(schema.fields, schema_context)
+        enhanced_fields = schema.fields if in_place else [None] * len(schema.fields)
         type_confidence = {}
         
-        for field in schema.fields:
-            # Create field-specific context
-            field_context = {
-                **schema_context,
-                'field_path': field.path,
-                'nullable': field.nullable,
-                'sample_values': field.sample_values,
-                'statistics': field.statistics or {},
-            }
-            
-            # Enhance type information
-            enhanced_type = self.infer_field_type(field, field_context)
+        for index, (field, enhanced_type) in enumerate(zip(schema.fields, enhanced_types)):
+            # Store enhanced type information in a copy of the field's metadata
+            enhanced_fields[index] = field.model_copy(update={
+                'metadata': {
+                    **(field.metadata or {}),
+                    'enhanced_type': enhanced_type.model_dump(),
+                },
+            })
             
-            # Store enhanced type information
-            enhanced_field = field.copy()
-            enhanced_field.metadata = {
-                **(enhanced_field.metadata or {}),
-                'enhanced_type': enhanced_type.dict(),
-            }
-            
-            enhanced_fields.append(enhanced_field)
             type_confidence[field.path] = enhanced_type.confidence.score
         
-        # Create enhanced schema
-        enhanced_schema = schema.copy()
-        enhanced_schema.fields = enhanced_fields
-        enhanced_schema.metadata = {
-            **(enhanced_schema.metadata or {}),
+        metadata = {
+            **(schema.metadata or {}),
             'type_confidence': type_confidence,
             'type_inference_version': '1.0.0',
         }
         
-        return enhanced_schema
+        if in_place:
+            schema.metadata = metadata
+            return schema
+        
+        # Create enhanced schema
+        return schema.model_copy(update={
+            'fields': enhanced_fields,
+            'metadata': metadata,
+        })
     
     def infer_field_type(self, field: FieldInfo, context: Dict[str, Any]) -> EnhancedTypeInfo:
         """
@@ -157,29 +229,134 @@ class TypeInferenceService:
         Returns:
             EnhancedTypeInfo: Enhanced type information.
         """
-        logger.debug("Inferring type for field: %s", field.path)
-        
-        # Apply each enhancer in order of priority
+        # Checked once, since the enhancer loop below logs at debug level
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            logger.debug("Inferring type for field: %s", field.path)
+        
+        # Reuse the result for fields with an identical signature
+        cache_key = self._get_field_signature(field)
+        cached_type = self._inference_cache.get(cache_key)
+        if cached_type is not None:
+            self._inference_cache.move_to_end(cache_key)
+            return cached_type.model_copy(deep=True)
+        
+        # Apply each enhancer in order of priority, sharing a single
+        # context whose current type is updated after each step
         current_type = self._create_base_type_info(field)
+        enhancer_context = {**context, 'current_type': current_type}
         
-        for enhancer in self.enhancers:
+        for enhancer_name, enhance_type in self._enhancer_chain:
             try:
-                enhanced_type = enhancer.enhance_type(field, {
-                    **context,
-                    'current_type': current_type,
-                })
-                current_type = enhanced_type
-                logger.debug("Applied enhancer %s to field %s", 
-                           enhancer.__class__.__name__, field.path)
+                current_type = enhance_type(field, enhancer_context)
+                enhancer_context['current_type'] = current_type
+                if debug_enabled:
+                    logger.debug("Applied enhancer %s to field %s", 
+                               enhancer_name, field.path)
             except Exception as e:
                 logger.warning("Enhancer %s failed for field %s: %s", 
-                              enhancer.__class__.__name__, field.path, str(e))
+                              enhancer_name, field.path, str(e))
         
         # Final confidence adjustment based on all available information
         current_type.confidence = self._finalize_confidence_score(current_type, field, context)
         
+        self._cache_type(cache_key, current_type)
+        
         return current_type
     
+    def _infer_field_types(self, fields: List[FieldInfo], 
+                           context: Dict[str, Any]) -> List[EnhancedTypeInfo]:
+        """
+        Infer enhanced type information for a batch of fields.
+        
+        Fields are passed through each enhancer's enhance_batch together.
+        Only the first field with a given signature is inferred; the others
+        reuse its result, as they would through the inference cache.
+        
+        Args:
+            fields: Field information.
+            context: Schema-wide context for type inference.
+            
+        Returns:
+            List[EnhancedTypeInfo]: Enhanced type information for each field.
+        """
+        enhanced_types: List[Optional[EnhancedTypeInfo]] = [None] * len(fields)
+        pending: Dict[Tuple, List[int]] = {}
+        
+        for index, field in enumerate(fields):
+            cache_key = self._get_field_signature(field)
+            cached_type = self._inference_cache.get(cache_key)
+            if cached_type is not None:
+                self._inference_cache.move_to_end(cache_key)
+                enhanced_types[index] = cached_type.model_copy(deep=True)
+            else:
+                pending.setdefault(cache_key, []).append(index)
+        
+        if not pending:
+            return enhanced_types
+        
+        # Apply each enhancer in order of priority to the whole batch
+        batch_fields = [fields[indices[0]] for indices in pending.values()]
+        current_types = [self._create_base_type_info(field) for field in batch_fields]
+        
+        for enhancer in self.enhancers:
+            current_types = enhancer.enhance_batch(batch_fields, context, current_types)
+            logger.debug("Applied enhancer %s to %d fields", 
+                        enhancer.__class__.__name__, len(batch_fields))
+        
+        for (cache_key, indices), field, current_type in zip(
+            pending.items(), batch_fields, current_types
+        ):
+            # Final confidence adjustment based on all available information
+            current_type.confidence = self._finalize_confidence_score(
+                current_type, field, context
+            )
+            self._cache_type(cache_key, current_type)
+            
+            enhanced_types[indices[0]] = current_type
+            for index in indices[1:]:
+                enhanced_types[index] = current_type.model_copy(deep=True)
+        
+        return enhanced_types
+    
+    def _cache_type(self, cache_key: Tuple, type_info: EnhancedTypeInfo):
+        """
+        Cache inferred type information for a field signature.
+        
+        Args:
+            cache_key: Field signature.
+            type_info: Inferred type information.
+        """
+        # Cache a private copy, since callers may mutate the returned type
+        self._inference_cache[cache_key] = type_info.model_copy(deep=True)
+        if len(self._inference_cache) > INFERENCE_CACHE_SIZE:
+            self._inference_cache.popitem(last=False)
+    
+    def clear_cache(self):
+        """Clear cached field type inference results."""
+        self._inference_cache.clear()
+    
+    def _get_field_signature(self, field: FieldInfo) -> Tuple:
+        """
+        Get a hashable signature of the field data used by the enhancers.
+        
+        Enhancers derive types from the field itself, so the field path,
+        description and schema-wide context are not part of the signature.
+        
+        Args:
+            field: Field information.
+            
+        Returns:
+            Tuple: Field signature.
+        """
+        return (
+            field.name,
+            field.data_type,
+            field.nullable,
+            tuple((c.type, repr(c.value), c.description) for c in field.constraints),
+            tuple(map(repr, field.sample_values or ())),
+        )
+    
     def _create_base_type_info(self, field: FieldInfo) -> EnhancedTypeInfo:
         """
         Create baseline type information from field data.
@@ -201,16 +378,12 @@ class TypeInferenceService:
             detection_method="parser_declared",
         )
         
+        # Empty collections are left to the model's default factories
         return EnhancedTypeInfo(
             primary_type=primary_type,
-            secondary_types=[],
-            format_specific_type=None,
             constraints=field.constraints,
-            patterns=[],
             confidence=confidence,
-            possible_alternatives=[],
             is_nullable=field.nullable,
-            metadata={},
         )
     
     def _finalize_confidence_score(
@@ -228,28 +401,27 @@ class TypeInferenceService:
             TypeConfidence: Final confidence information.
         """
         confidence = type_info.confidence
+        factors = confidence.factors
         
         # Adjust based on number of supporting factors
-        num_factors = len(confidence.factors)
+        num_factors = len(factors)
         if num_factors >= 3:
-            confidence.factors["multiple_indicators"] = 0.1
+            factors["multiple_indicators"] = 0.1
         
         # Adjust based on pattern detection
         if type_info.patterns:
-            confidence.factors["pattern_match"] = 0.1
+            factors["pattern_match"] = 0.1
         
         # Adjust for conflicting signals
         alternatives_count = len(type_info.possible_alternatives)
         if alternatives_count > 0:
-            confidence.factors["ambiguity_penalty"] = -0.1 * min(alternatives_count, 3)
+            factors["ambiguity_penalty"] = -0.1 * min(alternatives_count, 3)
         
-        # Recalculate final score
-        confidence.score = 0.5  # Base score
-        for factor, value in confidence.factors.items():
-            confidence.score += value
+        # Recalculate final score from the base score (0.5) and all factors
+        score = sum(factors.values(), 0.5)
         
         # Ensure score is within bounds
-        confidence.score = max(0.1, min(1.0, confidence.score))
+        confidence.score = max(0.1, min(1.0, score))
         
         return confidence
     
@@ -258,6 +430,9 @@ class TypeInferenceService:
         """
         Normalize type information to a format-neutral representation.
         
+        Nested item and property types are converted iteratively, so deeply
+        nested types are not limited by the recursion limit.
+        
         Args:
             type_info: Enhanced type information.
             target_format: Optional target format for specific conversion.
@@ -265,35 +440,50 @@ class TypeInferenceService:
         Returns:
             NormalizedType: Normalized type representation.
         """
-        # Simple implementation - would be extended for complex formats
-        normalized = NormalizedType(
-            base_type=type_info.primary_type,
-            format=target_format or "generic",
-            format_specific_type=type_info.format_specific_type,
-            constraints=type_info.constraints,
-            is_nullable=type_info.is_nullable,
-            metadata={
-                "patterns": [p.value for p in type_info.patterns],
-                "confidence": type_info.confidence.score,
-            },
-        )
+        normalized_root = None
+        # Queue of (type to convert, normalized parent, property name or None for items)
+        pending = deque([(type_info, None, None)])
         
-        # Handle complex types recursively
-        if type_info.primary_type == DataType.ARRAY and type_info.item_type:
-            item_normalized = self.normalize_type(type_info.item_type, target_format)
-            normalized.parameters.append(item_normalized)
-        
-        elif type_info.primary_type == DataType.OBJECT and type_info.properties:
-            for name, prop_type in type_info.properties.items():
-                normalized.properties[name] = self.normalize_type(prop_type, target_format)
+        while pending:
+            current, parent, name = pending.popleft()
+            
+            # Simple implementation - would be extended for complex formats
+            normalized = NormalizedType(
+                base_type=current.primary_type,
+                format=target_format or "generic",
+                format_specific_type=current.format_specific_type,
+                constraints=current.constraints,
+                is_nullable=current.is_nullable,
+                metadata={
+                    "patterns": [p.value for p in current.patterns],
+                    "confidence": current.confidence.score,
+                },
+            )
+            
+            if parent is None:
+                normalized_root = normalized
+            elif name is None:
+                parent.parameters.append(normalized)
+            else:
+                parent.properties[name] = normalized
+            
+            # Handle complex types
+            if current.primary_type == DataType.ARRAY and current.item_type:
+                pending.append((current.item_type, normalized, None))
+            
+            elif current.primary_type == DataType.OBJECT and current.properties:
+                for prop_name, prop_type in current.properties.items():
+                    pending.append((prop_type, normalized, prop_name))
         
-        return normalized
+        return normalized_root
 
     def denormalize_type(self, normalized: NormalizedType, 
                         target_format: str) -> EnhancedTypeInfo:
         """
         Convert a normalized type to a format-specific enhanced type.
         
+        Nested parameter and property types are converted iteratively.
+        
         Args:
             normalized: Normalized type information.
             target_format: Target format for conversion.
@@ -301,41 +491,56 @@ class TypeInferenceService:
         Returns:
             EnhancedTypeInfo: Format-specific enhanced type.
         """
-        # This is a placeholder implementation
-        # In a real implementation, would use format-specific handlers
-        confidence = TypeConfidence(
-            score=normalized.metadata.get("confidence", 0.7),
-            factors={"normalized_conversion": 0.7},
-            rationale=f"Converted from normalized type to {target_format}",
-            detection_method="denormalization",
-        )
-        
-        patterns = []
-        for pattern_str in normalized.metadata.get("patterns", []):
-            try:
-                patterns.append(TypePattern(pattern_str))
-            except ValueError:
-                logger.warning("Unknown pattern in normalized type: %s", pattern_str)
-        
-        enhanced = EnhancedTypeInfo(
-            primary_type=normalized.base_type,
-            secondary_types=[],
-            format_specific_type=None,  # Would be populated based on target format
-            constraints=normalized.constraints,
-            patterns=patterns,
-            confidence=confidence,
-            possible_alternatives=[],
-            is_nullable=normalized.is_nullable,
-            metadata=normalized.metadata,
-        )
+        enhanced_root = None
+        # Queue of (type to convert, enhanced parent, property name or None for items)
+        pending = deque([(normalized, None, None)])
         
-        # Handle complex types recursively
-        if normalized.base_type == DataType.ARRAY and normalized.parameters:
-            enhanced.item_type = self.denormalize_type(normalized.parameters[0], target_format)
+        while pending:
+            current, parent, name = pending.popleft()
             
-        elif normalized.base_type == DataType.OBJECT and normalized.properties:
-            enhanced.properties = {}
-            for name, prop_type in normalized.properties.items():
-                enhanced.properties[name] = self.denormalize_type(prop_type, target_format)
+            # This is a placeholder implementation
+            # In a real implementation, would use format-specific handlers
+            confidence = TypeConfidence(
+                score=current.metadata.get("confidence", 0.7),
+                factors={"normalized_conversion": 0.7},
+                rationale=f"Converted from normalized type to {target_format}",
+                detection_method="denormalization",
+            )
+            
+            patterns = []
+            for pattern_str in current.metadata.get("patterns", []):
+                pattern = _PATTERNS_BY_VALUE.get(pattern_str)
+                if pattern is not None:
+                    patterns.append(pattern)
+                else:
+                    logger.warning("Unknown pattern in normalized type: %s", pattern_str)
+            
+            enhanced = EnhancedTypeInfo(
+                primary_type=current.base_type,
+                secondary_types=[],
+                format_specific_type=None,  # Would be populated based on target format
+                constraints=current.constraints,
+                patterns=patterns,
+                confidence=confidence,
+                possible_alternatives=[],
+                is_nullable=current.is_nullable,
+                metadata=current.metadata,
+            )
+            
+            if parent is None:
+                enhanced_root = enhanced
+            elif name is None:
+                parent.item_type = enhanced
+            else:
+                parent.properties[name] = enhanced
+            
+            # Handle complex types
+            if current.base_type == DataType.ARRAY and current.parameters:
+                pending.append((current.parameters[0], enhanced, None))
+                
+            elif current.base_type == DataType.OBJECT and current.properties:
+                enhanced.properties = {}
+                for prop_name, prop_type in current.properties.items():
+                    pending.append((prop_type, enhanced, prop_name))
                 
-        return enhanced
+        return enhanced_root
@@ -44,6 +44,6 @@ class SchemaRelationshipStore(BaseModel):
     relationships: List[SchemaRelationship] = Field(..., description="List of detected relationships")
     schema_coverage: Dict[str, List[str]] = Field(default_factory=dict, 
                                                 description="Maps schemas to related schemas")
-    confidence_summary: Dict[str, float] = Field(default_factory=dict, 
-                                                description="Summary statistics for confidence")
+    confidence_summary: Dict[str, Any] = Field(default_factory=dict, 
+                                              description="Summary statistics for confidence")
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
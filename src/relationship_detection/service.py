@@ -1,39 +1,61 @@
 """
 Service for relationship detection operations.
 """
+import asyncio
+import bisect
 import logging
-from typing import Any, Dict, List, Optional, Set, Tuple
+import math
+import sys
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
 
 from src.format_detection.models import SchemaDetails
 from src.format_detection.type_inference.service import TypeInferenceService
-from src.relationship_detection.models import (
-    RelationshipConfidence,
-    SchemaRelationship,
-    SchemaRelationshipStore,
-)
+from src.relationship_detection.models import SchemaRelationship, SchemaRelationshipStore
 from src.relationship_detection.strategies.base import RelationshipStrategy
+from src.relationship_detection.strategies.foreign_key import ForeignKeyRelationshipStrategy
+from src.relationship_detection.strategies.name_based import NameBasedRelationshipStrategy
+from src.relationship_detection.strategies.structural import StructuralSimilarityStrategy
+from src.relationship_detection.utils.confidence import consolidate_relationships
+from src.relationship_detection.utils.consolidation import create_schema_coverage_map
+from src.relationship_detection.utils.soa import pack_relationships, summarize_confidence
 
 
 logger = logging.getLogger(__name__)
 
+# Minimum number of relationships for which the confidence summary is
+# computed over packed arrays; below this, packing costs more than it saves.
+# The packed path sums with numpy (pairwise summation) and the smaller path
+# sums sequentially, so the last digits of the mean values may differ
+# between the two for the same scores.
+SOA_MIN_RELATIONSHIPS = 1024
+
 
 class RelationshipDetectionService:
     """Service for relationship detection operations."""
     
+    __slots__ = (
+        "strategies",
+        "_strategy_priorities",
+        "_strategy_ids",
+        "type_inference_service",
+        "_enhance_lock",
+    )
+    
     def __init__(self):
         """Initialize the relationship detection service."""
         self.strategies: List[RelationshipStrategy] = []
+        self._strategy_priorities: List[int] = []
+        self._strategy_ids: List[str] = []
         self.type_inference_service = TypeInferenceService()
+        # Serializes schema enhancement across concurrent detection calls
+        self._enhance_lock = threading.Lock()
         self._register_strategies()
         logger.info("Initialized relationship detection service with %d strategies", len(self.strategies))
     
     def _register_strategies(self):
         """Register built-in relationship detection strategies."""
-        # Lazily import strategies to avoid circular import issues
-        from src.relationship_detection.strategies.foreign_key import ForeignKeyRelationshipStrategy
-        from src.relationship_detection.strategies.name_based import NameBasedRelationshipStrategy
-        from src.relationship_detection.strategies.structural import StructuralSimilarityStrategy
-        
         # Register strategies in order of priority
         self.register_strategy(ForeignKeyRelationshipStrategy())
         self.register_strategy(NameBasedRelationshipStrategy())
@@ -48,11 +70,15 @@ class RelationshipDetectionService:
         Args:
             strategy: Strategy instance.
         """
-        self.strategies.append(strategy)
-        # Sort strategies by priority (ascending)
-        self.strategies.sort(key=lambda s: s.get_priority())
+        # Insert in priority order (ascending, stable for equal priorities)
+        priority = strategy.get_priority()
+        strategy_id = strategy.get_id()
+        index = bisect.bisect_right(self._strategy_priorities, priority)
+        self._strategy_priorities.insert(index, priority)
+        self._strategy_ids.insert(index, strategy_id)
+        self.strategies.insert(index, strategy)
         logger.debug("Registered strategy: %s (priority: %d)", 
-                    strategy.get_id(), strategy.get_priority())
+                    strategy_id, priority)
     
     async def detect_relationships(
         self, 
@@ -85,86 +111,85 @@ class RelationshipDetectionService:
         confidence_threshold = options.get("confidence_threshold", 0.5)
         max_relationships = options.get("max_relationships", 1000)
         
-        # Enhance schemas with type inference if needed
+        # Enhance schemas with type inference if needed, in a worker thread
+        # so that the event loop is not blocked
         enhanced_schemas = schemas
         if options.get("enhance_types", True):
-            enhanced_schemas = [
-                self.type_inference_service.enhance_schema(schema) 
-                for schema in schemas
-            ]
+            enhanced_schemas = await asyncio.to_thread(self._enhance_schemas, schemas)
             logger.debug("Enhanced schema types for relationship detection")
         
-        # Collect all relationships from all strategies
+        # Run strategies concurrently in worker threads, so detection does not
+        # block the event loop; results are collected in priority order
+        results = await asyncio.gather(
+            *[
+                asyncio.to_thread(self._apply_strategy, strategy, enhanced_schemas, 
+                                  options, confidence_threshold)
+                for strategy in self.strategies
+            ],
+            return_exceptions=True,
+        )
+        
+        # Collect relationships meeting the confidence threshold from all strategies
         all_relationships: List[SchemaRelationship] = []
+        total_detected = 0
         
-        for strategy in self.strategies:
-            try:
-                # Filter and preprocess schemas for this strategy
-                filtered_schemas = strategy.filter_schemas(enhanced_schemas, options)
-                preprocessed_schemas = strategy.preprocess_schemas(filtered_schemas, options)
-                
-                # Detect relationships
-                logger.debug("Applying strategy: %s to %d schemas", 
-                           strategy.get_id(), len(preprocessed_schemas))
-                relationships = strategy.detect(preprocessed_schemas, options)
-                
-                # Postprocess relationships
-                relationships = strategy.postprocess_relationships(
-                    relationships, enhanced_schemas, options)
-                
-                logger.debug("Strategy %s detected %d relationships", 
-                           strategy.get_id(), len(relationships))
-                
-                all_relationships.extend(relationships)
-                
-            except Exception as e:
+        for strategy_id, result in zip(self._strategy_ids, results):
+            if isinstance(result, BaseException):
+                # Cancellation and other non-Exception errors are not strategy failures
+                if not isinstance(result, Exception):
+                    raise result
                 logger.error("Error in relationship detection strategy %s: %s", 
-                            strategy.get_id(), str(e), exc_info=True)
-        
-        # Use utility function to consolidate relationships
-        from src.relationship_detection.utils.confidence import consolidate_relationships
-        consolidated = consolidate_relationships(all_relationships, confidence_threshold)
-        
-        # Limit number of relationships if needed
-        if len(consolidated) > max_relationships:
-            logger.warning("Limiting relationships to %d (from %d)", 
-                         max_relationships, len(consolidated))
-            consolidated = consolidated[:max_relationships]
+                            strategy_id, str(result), exc_info=result)
+                continue
+            
+            detected, relationships = result
+            total_detected += detected
+            all_relationships.extend(relationships)
         
-        # Use utility functions to create schema coverage and calculate statistics
-        from src.relationship_detection.utils.consolidation import (
-            create_schema_coverage_map,
-            calculate_coverage_statistics,
+        # Use utility function to consolidate and limit relationships
+        consolidated = consolidate_relationships(
+            all_relationships, confidence_threshold, max_relationships
         )
         
+        # Use utility function to create schema coverage
         schema_coverage = create_schema_coverage_map(consolidated)
         
-        # Calculate confidence summary
-        confidence_summary = {
-            "mean": sum([r.confidence.score for r in consolidated]) / len(consolidated) if consolidated else 0.0,
-            "min": min([r.confidence.score for r in consolidated]) if consolidated else 0.0,
-            "max": max([r.confidence.score for r in consolidated]) if consolidated else 0.0,
-        }
-        
-        # Add by_type breakdown
-        by_type = {}
-        for rel in consolidated:
-            rel_type = rel.relationship_type.value
-            if rel_type not in by_type:
-                by_type[rel_type] = []
-            by_type[rel_type].append(rel.confidence.score)
-        
-        confidence_summary["by_type"] = {
-            rel_type: sum(scores) / len(scores)
-            for rel_type, scores in by_type.items()
-        }
+        # Calculate confidence summary and by_type breakdown in a single pass
+        if len(consolidated) >= SOA_MIN_RELATIONSHIPS:
+            confidence_summary = summarize_confidence(pack_relationships(consolidated))
+        elif consolidated:
+            score_sum = 0.0
+            score_min = math.inf
+            score_max = -math.inf
+            by_type: Dict[str, List[float]] = defaultdict(list)
+            
+            for rel in consolidated:
+                score = rel.confidence.score
+                score_sum += score
+                if score < score_min:
+                    score_min = score
+                if score > score_max:
+                    score_max = score
+                by_type[rel.relationship_type.value].append(score)
+            
+            confidence_summary = {
+                "mean": score_sum / len(consolidated),
+                "min": score_min,
+                "max": score_max,
+                "by_type": {
+                    rel_type: sum(scores) / len(scores)
+                    for rel_type, scores in by_type.items()
+                },
+            }
+        else:
+            confidence_summary = {"mean": 0.0, "min": 0.0, "max": 0.0, "by_type": {}}
         
         # Create metadata
         metadata = {
             "total_schemas_analyzed": len(schemas),
-            "total_relationships_detected": len(all_relationships),
+            "total_relationships_detected": total_detected,
             "total_relationships_after_consolidation": len(consolidated),
-            "strategies_applied": [s.get_id() for s in self.strategies],
+            "strategies_applied": list(self._strategy_ids),
             "options": options,
         }
         
@@ -180,171 +205,75 @@ class RelationshipDetectionService:
                    len(consolidated), len(schemas))
         return relationship_store
     
-    def _consolidate_relationships(
-        self,
-        relationships: List[SchemaRelationship],
-        confidence_threshold: float = 0.5
-    ) -> List[SchemaRelationship]:
-        """
-        Consolidate and filter relationships.
-        
-        Args:
-            relationships: List of detected relationships.
-            confidence_threshold: Minimum confidence threshold.
-            
-        Returns:
-            List[SchemaRelationship]: Consolidated relationships.
-        """
-        # Filter by confidence
-        filtered = [r for r in relationships if r.confidence.score >= confidence_threshold]
-        
-        # Group by source and target schema
-        grouped: Dict[Tuple[str, str], List[SchemaRelationship]] = {}
-        for rel in filtered:
-            key = (rel.source_schema, rel.target_schema)
-            if key not in grouped:
-                grouped[key] = []
-            grouped[key].append(rel)
-        
-        # Consolidate each group
-        consolidated: List[SchemaRelationship] = []
-        for (source, target), group in grouped.items():
-            if len(group) == 1:
-                # Only one relationship, keep as is
-                consolidated.append(group[0])
-            else:
-                # Multiple relationships, consolidate
-                consolidated.append(self._merge_relationships(group))
-        
-        # Sort by confidence score (descending)
-        consolidated.sort(key=lambda r: r.confidence.score, reverse=True)
-        
-        return consolidated
-    
-    def _merge_relationships(self, relationships: List[SchemaRelationship]) -> SchemaRelationship:
-        """
-        Merge multiple relationships between the same schemas.
-        
-        Args:
-            relationships: List of relationships to merge.
-            
-        Returns:
-            SchemaRelationship: Merged relationship.
+    def _enhance_schemas(self, schemas: List[SchemaDetails]) -> List[SchemaDetails]:
         """
-        # Select the highest confidence relationship as base
-        base = max(relationships, key=lambda r: r.confidence.score)
-        
-        # Collect all confidence factors
-        all_factors: Dict[str, List[float]] = {}
-        for rel in relationships:
-            for factor, value in rel.confidence.factors.items():
-                if factor not in all_factors:
-                    all_factors[factor] = []
-                all_factors[factor].append(value)
-        
-        # Average the factors
-        merged_factors = {factor: sum(values) / len(values) 
-                         for factor, values in all_factors.items()}
-        
-        # Add a "multiple_signals" boost if multiple strategies detected this relationship
-        strategy_set = {rel.confidence.detection_method for rel in relationships}
-        if len(strategy_set) > 1:
-            merged_factors["multiple_signals"] = 0.1 * min(len(strategy_set), 3)
-        
-        # Calculate merged confidence score
-        base_score = sum(merged_factors.values())
-        merged_score = max(0.1, min(1.0, base_score))
-        
-        # Create merged confidence
-        merged_confidence = RelationshipConfidence(
-            score=merged_score,
-            factors=merged_factors,
-            rationale=f"Merged from {len(relationships)} relationship detections",
-            detection_method=", ".join(sorted(strategy_set)),
-        )
+        Enhance type information in schemas.
         
-        # Create merged relationship
-        return SchemaRelationship(
-            source_schema=base.source_schema,
-            target_schema=base.target_schema,
-            source_fields=base.source_fields,
-            target_fields=base.target_fields,
-            relationship_type=base.relationship_type,
-            confidence=merged_confidence,
-            bidirectional=base.bidirectional,
-            metadata={
-                "merged_from": len(relationships),
-                "original_methods": list(strategy_set),
-            },
-        )
-    
-    def _create_schema_coverage(self, relationships: List[SchemaRelationship]) -> Dict[str, List[str]]:
-        """
-        Create schema coverage mapping.
+        Schemas are enhanced one after another, and concurrent detection
+        calls take turns, since the type inference service shares its
+        inference cache across schemas.
         
         Args:
-            relationships: List of relationships.
+            schemas: List of schema details.
             
         Returns:
-            Dict[str, List[str]]: Mapping from schema ID to related schemas.
+            List[SchemaDetails]: Enhanced schema details.
         """
-        coverage: Dict[str, Set[str]] = {}
-        
-        for rel in relationships:
-            source = rel.source_schema
-            target = rel.target_schema
-            
-            if source not in coverage:
-                coverage[source] = set()
-            coverage[source].add(target)
-            
-            # Add bidirectional reference if needed
-            if rel.bidirectional:
-                if target not in coverage:
-                    coverage[target] = set()
-                coverage[target].add(source)
-        
-        # Convert sets to sorted lists
-        return {
-            schema: sorted(list(related)) 
-            for schema, related in coverage.items()
-        }
+        with self._enhance_lock:
+            return [
+                self.type_inference_service.enhance_schema(schema) 
+                for schema in schemas
+            ]
     
-    def _calculate_mean_confidence(self, relationships: List[SchemaRelationship]) -> float:
+    def _apply_strategy(
+        self,
+        strategy: RelationshipStrategy,
+        schemas: List[SchemaDetails],
+        options: Dict[str, Any],
+        confidence_threshold: float = 0.0
+    ) -> Tuple[int, List[SchemaRelationship]]:
         """
-        Calculate mean confidence score across all relationships.
+        Apply a single detection strategy to schemas.
         
-        Args:
-            relationships: List of relationships.
-            
-        Returns:
-            float: Mean confidence score (0.0 if no relationships).
-        """
-        if not relationships:
-            return 0.0
-            
-        total = sum(rel.confidence.score for rel in relationships)
-        return total / len(relationships)
-    
-    def _calculate_confidence_by_type(self, relationships: List[SchemaRelationship]) -> Dict[str, float]:
-        """
-        Calculate mean confidence score by relationship type.
+        Relationships are consumed from the strategy's stream as they are
+        produced, keeping only those meeting the confidence threshold.
         
         Args:
-            relationships: List of relationships.
+            strategy: Strategy to apply.
+            schemas: List of (enhanced) schema details to analyze.
+            options: Detection options.
+            confidence_threshold: Minimum confidence of kept relationships.
             
         Returns:
-            Dict[str, float]: Mean confidence by relationship type.
+            Tuple[int, List[SchemaRelationship]]: Number of relationships detected
+                by the strategy, and those meeting the confidence threshold.
         """
-        by_type: Dict[str, List[float]] = {}
-        
-        for rel in relationships:
-            rel_type = rel.relationship_type.value
-            if rel_type not in by_type:
-                by_type[rel_type] = []
-            by_type[rel_type].append(rel.confidence.score)
-        
-        return {
-            rel_type: sum(scores) / len(scores)
-            for rel_type, scores in by_type.items()
-        }
+        # Filter and preprocess schemas for this strategy
+        filtered_schemas = strategy.filter_schemas(schemas, options)
+        preprocessed_schemas = strategy.preprocess_schemas(filtered_schemas, options)
+        
+        # Detect relationships
+        logger.debug("Applying strategy: %s to %d schemas", 
+                   strategy.get_id(), len(preprocessed_schemas))
+        stream = strategy.detect_stream(preprocessed_schemas, options)
+        
+        # Postprocess relationships
+        stream = strategy.postprocess_stream(stream, schemas, options)
+        
+        detected = 0
+        relationships: List[SchemaRelationship] = []
+        for rel in stream:
+            detected += 1
+            if rel.confidence.score < confidence_threshold:
+                continue
+            # Intern the identifiers used as grouping keys, so that key
+            # comparisons during consolidation short-circuit on identity
+            rel.source_schema = sys.intern(rel.source_schema)
+            rel.target_schema = sys.intern(rel.target_schema)
+            rel.confidence.detection_method = sys.intern(rel.confidence.detection_method)
+            relationships.append(rel)
+        
+        logger.debug("Strategy %s detected %d relationships", 
+                   strategy.get_id(), detected)
+        
+        return detected, relationships
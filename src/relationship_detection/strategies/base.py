@@ -3,7 +3,7 @@ Base strategy class for relationship detection.
 """
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from src.format_detection.models import SchemaDetails
 from src.relationship_detection.models import SchemaRelationship
@@ -15,6 +15,8 @@ logger = logging.getLogger(__name__)
 class RelationshipStrategy(ABC):
     """Abstract base class for all relationship detection strategies."""
     
+    __slots__ = ()
+    
     @abstractmethod
     def detect(self, schemas: List[SchemaDetails], options: Optional[Dict[str, Any]] = None) -> List[SchemaRelationship]:
         """
@@ -29,6 +31,23 @@ class RelationshipStrategy(ABC):
         """
         pass
     
+    def detect_stream(self, schemas: List[SchemaDetails], 
+                      options: Optional[Dict[str, Any]] = None) -> Iterator[SchemaRelationship]:
+        """
+        Detect relationships between schemas, yielding them as they are found.
+        
+        Strategies that can produce relationships incrementally may override this
+        with a generator; the default implementation adapts detect().
+        
+        Args:
+            schemas: List of schema details to analyze.
+            options: Optional detection options.
+            
+        Returns:
+            Iterator[SchemaRelationship]: Detected relationships.
+        """
+        return iter(self.detect(schemas, options))
+    
     @abstractmethod
     def get_priority(self) -> int:
         """
@@ -101,3 +120,23 @@ class RelationshipStrategy(ABC):
         """
         # Default implementation: no postprocessing
         return relationships
+    
+    def postprocess_stream(self, relationships: Iterable[SchemaRelationship], 
+                           schemas: List[SchemaDetails],
+                           options: Optional[Dict[str, Any]] = None) -> Iterator[SchemaRelationship]:
+        """
+        Postprocess a stream of detected relationships.
+        
+        Strategies whose postprocessing works one relationship at a time may
+        override this; the default implementation buffers the stream and
+        adapts postprocess_relationships().
+        
+        Args:
+            relationships: Detected relationships.
+            schemas: List of schema details.
+            options: Optional postprocessing options.
+            
+        Returns:
+            Iterator[SchemaRelationship]: Postprocessed relationships.
+        """
+        return iter(self.postprocess_relationships(list(relationships), schemas, options))
@@ -2,9 +2,10 @@
 Foreign key relationship detection strategy.
 """
 import logging
+import sys
 from typing import Any, Dict, List, Optional, Set, Tuple
 
-from src.format_detection.models import SchemaDetails
+from src.format_detection.models import FieldInfo, SchemaDetails
 from src.relationship_detection.models import (
     RelationshipConfidence,
     RelationshipType,
@@ -15,6 +16,15 @@ from src.relationship_detection.strategies.base import RelationshipStrategy
 
 logger = logging.getLogger(__name__)
 
+# Foreign key definition keys, in probe order, naming the source fields,
+# target schema and target fields across dialects
+_SOURCE_KEYS = ("source_columns", "columns", "fields")
+_TARGET_SCHEMA_KEYS = ("referenced_table", "referenced_entity", "target_table", "target", "references")
+_TARGET_FIELD_KEYS = ("referenced_columns", "target_columns", "target_fields")
+
+# Base confidence score of an explicit foreign key definition
+_EXPLICIT_FOREIGN_KEY_SCORE = 0.9
+
 
 class ForeignKeyRelationshipStrategy(RelationshipStrategy):
     """
@@ -25,6 +35,8 @@ class ForeignKeyRelationshipStrategy(RelationshipStrategy):
     since it uses declared metadata rather than inference.
     """
     
+    __slots__ = ()
+    
     def detect(self, schemas: List[SchemaDetails], options: Optional[Dict[str, Any]] = None) -> List[SchemaRelationship]:
         """
         Detect relationships based on foreign key constraints.
@@ -42,70 +54,37 @@ class ForeignKeyRelationshipStrategy(RelationshipStrategy):
         options = options or {}
         min_confidence = options.get("min_confidence", 0.7)
         
-        # Create schema lookup by ID (we'll need this to resolve references)
-        schema_lookup = {self._get_schema_id(schema): schema for schema in schemas}
-        
-        # Collect relationships
-        relationships: List[SchemaRelationship] = []
-        
-        # Process each schema
-        for schema in schemas:
-            schema_id = self._get_schema_id(schema)
-            
-            # Skip schemas with no foreign keys
-            if not schema.foreign_keys:
-                continue
-            
-            logger.debug("Processing %d foreign keys in schema %s", 
-                       len(schema.foreign_keys), schema_id)
-            
-            # Process each foreign key
-            for fk in schema.foreign_keys:
-                # Extract foreign key information
-                try:
-                    source_fields = self._extract_source_fields(fk)
-                    target_schema_id = self._extract_target_schema(fk, schema_id)
-                    target_fields = self._extract_target_fields(fk)
-                    
-                    # Skip if target schema not in our dataset
-                    if target_schema_id not in schema_lookup:
-                        logger.warning("Target schema %s not found for foreign key in %s", 
-                                     target_schema_id, schema_id)
-                        continue
-                    
-                    # Determine relationship type
-                    rel_type = self._determine_relationship_type(
-                        schema, schema_lookup.get(target_schema_id), source_fields, target_fields)
-                    
-                    # Calculate confidence
-                    confidence = self._calculate_confidence(schema, fk)
-                    
-                    # Skip if confidence below threshold
-                    if confidence.score < min_confidence:
-                        continue
-                    
-                    # Create relationship
-                    relationship = SchemaRelationship(
-                        source_schema=schema_id,
-                        target_schema=target_schema_id,
-                        source_fields=source_fields,
-                        target_fields=target_fields,
-                        relationship_type=rel_type,
-                        confidence=confidence,
-                        bidirectional=False,  # Foreign keys are unidirectional by default
-                        metadata={
-                            "foreign_key_name": fk.get("name", "unnamed"),
-                            "is_explicit": True,
-                        }
-                    )
-                    
-                    relationships.append(relationship)
-                    logger.debug("Detected foreign key relationship: %s.%s -> %s.%s", 
-                               schema_id, source_fields, target_schema_id, target_fields)
-                    
-                except (KeyError, ValueError) as e:
-                    logger.warning("Error processing foreign key in schema %s: %s", 
-                                 schema_id, str(e))
+        # Resolve each schema's ID once, and create a schema lookup by ID
+        # (we'll need this to resolve references)
+        get_schema_id = self._get_schema_id
+        schema_ids = [get_schema_id(schema) for schema in schemas]
+        schema_lookup = dict(zip(schema_ids, schemas))
+        
+        # Key indexes of schemas, built on first use (keyed by object id)
+        schema_indexes: Dict[int, Dict[str, Any]] = {}
+        
+        # Flatten all foreign keys of all schemas into one list of entries
+        fk_entries = [
+            (schema_id, schema, fk)
+            for schema_id, schema in zip(schema_ids, schemas)
+            for fk in schema.foreign_keys
+        ]
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            logger.debug("Processing %d foreign keys", len(fk_entries))
+        
+        # Create a relationship for each foreign key, skipping rejected ones
+        create_relationship = self._create_relationship
+        relationships = [
+            relationship
+            for relationship in (
+                create_relationship(
+                    schema_id, schema, fk, schema_lookup, schema_indexes, min_confidence,
+                    debug_enabled)
+                for schema_id, schema, fk in fk_entries
+            )
+            if relationship is not None
+        ]
         
         logger.info("Detected %d foreign key relationships", len(relationships))
         return relationships
@@ -119,6 +98,84 @@ class ForeignKeyRelationshipStrategy(RelationshipStrategy):
         """
         return 10  # Highest priority since it's based on explicit metadata
     
+    def _create_relationship(
+        self,
+        schema_id: str,
+        schema: SchemaDetails,
+        foreign_key: Dict[str, Any],
+        schema_lookup: Dict[str, SchemaDetails],
+        schema_indexes: Dict[int, Dict[str, Any]],
+        min_confidence: float,
+        debug_enabled: bool
+    ) -> Optional[SchemaRelationship]:
+        """
+        Create the relationship for a single foreign key definition.
+        
+        Args:
+            schema_id: ID of the schema defining the foreign key.
+            schema: Schema defining the foreign key.
+            foreign_key: Foreign key definition.
+            schema_lookup: Analyzed schemas by ID.
+            schema_indexes: Cache of schema key indexes, keyed by schema object id.
+            min_confidence: Minimum confidence of created relationships.
+            debug_enabled: Whether debug logging is enabled.
+            
+        Returns:
+            Optional[SchemaRelationship]: Relationship, or None if the foreign key
+                is skipped or cannot be processed.
+        """
+        target_schema_id = self._extract_target_schema(foreign_key, schema_id)
+        if target_schema_id is None:
+            logger.warning("Could not determine target schema from foreign key in schema %s", 
+                         schema_id)
+            return None
+        
+        # Skip if target schema not in our dataset, before extracting fields
+        if target_schema_id not in schema_lookup:
+            logger.warning("Target schema %s not found for foreign key in %s", 
+                         target_schema_id, schema_id)
+            return None
+        
+        # Skip if confidence below threshold, before doing any other work
+        meta_quality = self._calculate_metadata_quality(foreign_key)
+        if min(1.0, _EXPLICIT_FOREIGN_KEY_SCORE + meta_quality) < min_confidence:
+            return None
+        
+        source_fields = self._extract_source_fields(foreign_key)
+        if source_fields is None:
+            logger.warning("Could not determine source fields from foreign key in schema %s", 
+                         schema_id)
+            return None
+        target_fields = self._extract_target_fields(foreign_key, source_fields)
+        
+        # Determine relationship type
+        rel_type = self._determine_relationship_type(
+            schema, schema_lookup.get(target_schema_id), source_fields, target_fields,
+            schema_indexes)
+        
+        # Calculate confidence
+        confidence = self._calculate_confidence(schema, foreign_key, meta_quality)
+        
+        # Create relationship
+        relationship = SchemaRelationship(
+            source_schema=schema_id,
+            target_schema=target_schema_id,
+            source_fields=source_fields,
+            target_fields=target_fields,
+            relationship_type=rel_type,
+            confidence=confidence,
+            bidirectional=False,  # Foreign keys are unidirectional by default
+            metadata={
+                "foreign_key_name": foreign_key.get("name", "unnamed"),
+                "is_explicit": True,
+            }
+        )
+        
+        if debug_enabled:
+            logger.debug("Detected foreign key relationship: %s.%s -> %s.%s", 
+                       schema_id, source_fields, target_schema_id, target_fields)
+        return relationship
+    
     def _get_schema_id(self, schema: SchemaDetails) -> str:
         """
         Get a unique identifier for a schema.
@@ -127,22 +184,22 @@ class ForeignKeyRelationshipStrategy(RelationshipStrategy):
             schema: Schema details.
             
         Returns:
-            str: Schema identifier.
+            str: Schema identifier (interned, as it recurs across relationships).
         """
         # Use format-specific ID if available
         for meta_key in ["table_name", "collection_name", "class_name", "entity_name"]:
             if schema.metadata and meta_key in schema.metadata:
-                return str(schema.metadata[meta_key])
+                return sys.intern(str(schema.metadata[meta_key]))
         
         # Fallback to a generated ID based on fields
         if schema.fields:
             first_field = schema.fields[0].name
-            return f"schema_{len(schema.fields)}_{first_field}"
+            return sys.intern(f"schema_{len(schema.fields)}_{first_field}")
         
         # Last resort
-        return f"schema_{id(schema)}"
+        return sys.intern(f"schema_{id(schema)}")
     
-    def _extract_source_fields(self, foreign_key: Dict[str, Any]) -> List[str]:
+    def _extract_source_fields(self, foreign_key: Dict[str, Any]) -> Optional[List[str]]:
         """
         Extract source fields from foreign key definition.
         
@@ -150,22 +207,22 @@ class ForeignKeyRelationshipStrategy(RelationshipStrategy):
             foreign_key: Foreign key definition.
             
         Returns:
-            List[str]: Source field names.
+            Optional[List[str]]: Source field names, or None if they cannot be determined.
         """
-        if "source_columns" in foreign_key:
-            return foreign_key["source_columns"]
-        if "columns" in foreign_key:
-            return foreign_key["columns"]
-        if "fields" in foreign_key:
-            return foreign_key["fields"]
+        for key in _SOURCE_KEYS:
+            source_fields = foreign_key.get(key)
+            if source_fields is not None:
+                return source_fields
         
         # Try to extract from composite structure
         if "column_mapping" in foreign_key:
             return list(foreign_key["column_mapping"].keys())
         
-        raise ValueError("Could not determine source fields from foreign key")
+        return None
     
-    def _extract_target_schema(self, foreign_key: Dict[str, Any], source_schema_id: str) -> str:
+    def _extract_target_schema(
+        self, foreign_key: Dict[str, Any], source_schema_id: str
+    ) -> Optional[str]:
         """
         Extract target schema from foreign key definition.
         
@@ -174,44 +231,42 @@ class ForeignKeyRelationshipStrategy(RelationshipStrategy):
             source_schema_id: ID of the source schema.
             
         Returns:
-            str: Target schema ID.
+            Optional[str]: Target schema ID, or None if it cannot be determined.
         """
-        if "referenced_table" in foreign_key:
-            return foreign_key["referenced_table"]
-        if "referenced_entity" in foreign_key:
-            return foreign_key["referenced_entity"]
-        if "target_table" in foreign_key:
-            return foreign_key["target_table"]
-        if "target" in foreign_key:
-            return foreign_key["target"]
-        if "references" in foreign_key:
-            return foreign_key["references"]
-        
-        raise ValueError("Could not determine target schema from foreign key")
+        for key in _TARGET_SCHEMA_KEYS:
+            target_schema_id = foreign_key.get(key)
+            if target_schema_id is not None:
+                return target_schema_id
+        
+        return None
     
-    def _extract_target_fields(self, foreign_key: Dict[str, Any]) -> List[str]:
+    def _extract_target_fields(
+        self, foreign_key: Dict[str, Any], source_fields: Optional[List[str]] = None
+    ) -> Optional[List[str]]:
         """
         Extract target fields from foreign key definition.
         
         Args:
             foreign_key: Foreign key definition.
+            source_fields: Source fields of the foreign key, if already extracted.
             
         Returns:
-            List[str]: Target field names.
+            Optional[List[str]]: Target field names, or None if they cannot be determined.
         """
-        if "referenced_columns" in foreign_key:
-            return foreign_key["referenced_columns"]
-        if "target_columns" in foreign_key:
-            return foreign_key["target_columns"]
-        if "target_fields" in foreign_key:
-            return foreign_key["target_fields"]
+        for key in _TARGET_FIELD_KEYS:
+            target_fields = foreign_key.get(key)
+            if target_fields is not None:
+                return target_fields
         
         # Try to extract from composite structure
         if "column_mapping" in foreign_key:
             return list(foreign_key["column_mapping"].values())
         
         # If not specified, we'll assume target fields match source field names
-        source_fields = self._extract_source_fields(foreign_key)
+        if source_fields is None:
+            source_fields = self._extract_source_fields(foreign_key)
+            if source_fields is None:
+                return None
         
         # For simple id references, we'll assume the target field is "id"
         if len(source_fields) == 1 and source_fields[0].endswith("_id"):
@@ -224,7 +279,8 @@ class ForeignKeyRelationshipStrategy(RelationshipStrategy):
         source_schema: SchemaDetails, 
         target_schema: Optional[SchemaDetails],
         source_fields: List[str],
-        target_fields: List[str]
+        target_fields: List[str],
+        schema_indexes: Optional[Dict[int, Dict[str, Any]]] = None
     ) -> RelationshipType:
         """
         Determine the type of relationship based on schema metadata.
@@ -234,20 +290,26 @@ class ForeignKeyRelationshipStrategy(RelationshipStrategy):
             target_schema: Target schema details (may be None if not available).
             source_fields: Source field names.
             target_fields: Target field names.
+            schema_indexes: Optional cache of schema key indexes, keyed by schema object id.
             
         Returns:
             RelationshipType: Relationship type.
         """
+        if schema_indexes is None:
+            schema_indexes = {}
+        
         # Default to many-to-one
         rel_type = RelationshipType.MANY_TO_ONE
         
         # Check if source fields are unique/primary key
-        source_is_unique = self._fields_are_unique(source_schema, source_fields)
+        source_is_unique = self._fields_are_unique(
+            source_schema, source_fields, self._get_schema_index(source_schema, schema_indexes))
         
         # Check if target fields are unique/primary key
         target_is_unique = True  # Assume target is primary key by default
         if target_schema:
-            target_is_unique = self._fields_are_unique(target_schema, target_fields)
+            target_is_unique = self._fields_are_unique(
+                target_schema, target_fields, self._get_schema_index(target_schema, schema_indexes))
         
         # Determine relationship type based on uniqueness
         if source_is_unique and target_is_unique:
@@ -263,41 +325,86 @@ class ForeignKeyRelationshipStrategy(RelationshipStrategy):
         
         return rel_type
     
-    def _fields_are_unique(self, schema: SchemaDetails, field_names: List[str]) -> bool:
+    def _get_schema_index(
+        self, schema: SchemaDetails, schema_indexes: Dict[int, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Get the key index of a schema, building it on first use.
+        
+        Args:
+            schema: Schema details.
+            schema_indexes: Cache of schema key indexes, keyed by schema object id.
+            
+        Returns:
+            Dict[str, Any]: Fields by name (first field wins for duplicate names),
+                primary key set and unique constraint sets of the schema, and
+                the results of uniqueness checks by field name set.
+        """
+        schema_index = schema_indexes.get(id(schema))
+        if schema_index is None:
+            fields: Dict[str, FieldInfo] = {}
+            for field in schema.fields:
+                fields.setdefault(field.name, field)
+            schema_index = {
+                "fields": fields,
+                "pk_set": frozenset(schema.primary_keys),
+                "unique_sets": {frozenset(constraint) for constraint in schema.unique_constraints},
+                "unique_results": {},
+            }
+            schema_indexes[id(schema)] = schema_index
+        return schema_index
+    
+    def _fields_are_unique(
+        self, 
+        schema: SchemaDetails, 
+        field_names: List[str],
+        schema_index: Optional[Dict[str, Any]] = None
+    ) -> bool:
         """
         Check if fields form a unique constraint in the schema.
         
         Args:
             schema: Schema details.
             field_names: Field names to check.
+            schema_index: Optional key index of the schema.
             
         Returns:
             bool: True if fields form a unique constraint.
         """
-        # Check if fields match primary key
-        if set(field_names) == set(schema.primary_keys):
-            return True
-        
-        # Check if fields match a unique constraint
-        for constraint in schema.unique_constraints:
-            if set(field_names) == set(constraint):
-                return True
-        
-        # Check if each field has a unique flag in its metadata
-        fields_are_unique = True
-        for name in field_names:
-            field = next((f for f in schema.fields if f.name == name), None)
-            if field and field.metadata.get("unique") is not True:
-                fields_are_unique = False
-                break
-        
-        if fields_are_unique and field_names:
-            return True
-        
-        return False
+        if schema_index is None:
+            schema_index = self._get_schema_index(schema, {})
+        
+        # Uniqueness depends only on the set of field names, so reuse earlier results
+        names = frozenset(field_names)
+        unique_results = schema_index["unique_results"]
+        is_unique = unique_results.get(names)
+        if is_unique is not None:
+            return is_unique
+        
+        # Check if fields match primary key or a unique constraint
+        if names == schema_index["pk_set"] or names in schema_index["unique_sets"]:
+            is_unique = True
+        else:
+            field_index = schema_index["fields"]
+            
+            # Check if each field has a unique flag in its metadata
+            fields_are_unique = True
+            for name in names:
+                field = field_index.get(name)
+                if field and field.metadata.get("unique") is not True:
+                    fields_are_unique = False
+                    break
+            
+            is_unique = fields_are_unique and bool(names)
+        
+        unique_results[names] = is_unique
+        return is_unique
     
     def _calculate_confidence(
-        self, schema: SchemaDetails, foreign_key: Dict[str, Any]
+        self, 
+        schema: SchemaDetails, 
+        foreign_key: Dict[str, Any],
+        meta_quality: Optional[float] = None
     ) -> RelationshipConfidence:
         """
         Calculate confidence for a foreign key relationship.
@@ -305,28 +412,18 @@ class ForeignKeyRelationshipStrategy(RelationshipStrategy):
         Args:
             schema: Schema details.
             foreign_key: Foreign key definition.
+            meta_quality: Metadata quality of the foreign key, if already calculated.
             
         Returns:
             RelationshipConfidence: Confidence information.
         """
         # Start with high confidence for explicit foreign keys
-        base_score = 0.9
-        factors = {"explicit_foreign_key": 0.9}
+        base_score = _EXPLICIT_FOREIGN_KEY_SCORE
+        factors = {"explicit_foreign_key": _EXPLICIT_FOREIGN_KEY_SCORE}
         
         # Adjust based on metadata quality
-        meta_quality = 0.0
-        
-        # Check for explicit name
-        if "name" in foreign_key:
-            meta_quality += 0.02
-            
-        # Check for constraint definitions
-        if "on_delete" in foreign_key or "on_update" in foreign_key:
-            meta_quality += 0.02
-            
-        # Check for validation status
-        if foreign_key.get("validated", False):
-            meta_quality += 0.03
+        if meta_quality is None:
+            meta_quality = self._calculate_metadata_quality(foreign_key)
         
         if meta_quality > 0:
             factors["metadata_quality"] = meta_quality
@@ -340,3 +437,21 @@ class ForeignKeyRelationshipStrategy(RelationshipStrategy):
             rationale="Explicit foreign key definition",
             detection_method="foreign_key_analysis",
         )
+    
+    def _calculate_metadata_quality(self, foreign_key: Dict[str, Any]) -> float:
+        """
+        Calculate the metadata quality bonus of a foreign key definition.
+        
+        Args:
+            foreign_key: Foreign key definition.
+            
+        Returns:
+            float: Metadata quality bonus.
+        """
+        # Sum the bonuses for an explicit name, constraint definitions and
+        # validation status, using the checks as 0/1 multipliers
+        return (
+            0.02 * ("name" in foreign_key)
+            + 0.02 * ("on_delete" in foreign_key or "on_update" in foreign_key)
+            + 0.03 * bool(foreign_key.get("validated", False))
+        )
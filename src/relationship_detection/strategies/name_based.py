@@ -3,9 +3,11 @@ Name-based relationship detection strategy.
 """
 import logging
 import re
+from collections import defaultdict
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Set, Tuple, Pattern
 
-from src.format_detection.models import DataType, SchemaDetails
+from src.format_detection.models import DataType, FieldInfo, SchemaDetails
 from src.relationship_detection.models import (
     RelationshipConfidence,
     RelationshipType,
@@ -16,6 +18,85 @@ from src.relationship_detection.strategies.base import RelationshipStrategy
 
 logger = logging.getLogger(__name__)
 
+# Field name affixes suggesting a foreign key
+_FOREIGN_KEY_SUFFIXES = ("_id", "Id", "_key", "Key", "_ref", "Ref")
+_FOREIGN_KEY_PREFIXES = ("fk_", "FK_")
+
+# (pattern, confidence) for foreign key naming conventions
+_FOREIGN_KEY_PATTERNS: List[Tuple[Pattern, float]] = [
+    # Exact match pattern: <table>_id 
+    (re.compile(r"^([a-z0-9_]+)_id$", re.IGNORECASE), 0.7),
+    
+    # Suffix pattern: <table>id 
+    (re.compile(r"^([a-z0-9_]+)id$", re.IGNORECASE), 0.65),
+    
+    # FK pattern: fk_<table>
+    (re.compile(r"^fk_([a-z0-9_]+)$", re.IGNORECASE), 0.75),
+    
+    # Ref pattern: <table>_ref
+    (re.compile(r"^([a-z0-9_]+)_ref$", re.IGNORECASE), 0.6),
+    
+    # Reference pattern: <table>_reference
+    (re.compile(r"^([a-z0-9_]+)_reference$", re.IGNORECASE), 0.65),
+    
+    # UUID pattern: <table>_uuid
+    (re.compile(r"^([a-z0-9_]+)_uuid$", re.IGNORECASE), 0.7),
+    
+    # Key pattern: <table>_key
+    (re.compile(r"^([a-z0-9_]+)_key$", re.IGNORECASE), 0.65),
+    
+    # Simple pattern: <table>
+    (re.compile(r"^([a-z0-9_]+)$", re.IGNORECASE), 0.3),
+]
+
+# (affix, is_prefix, confidence) for each foreign key pattern, in the same
+# order as _FOREIGN_KEY_PATTERNS
+_FOREIGN_KEY_AFFIXES = (
+    ("_id", False, 0.7),
+    ("id", False, 0.65),
+    ("fk_", True, 0.75),
+    ("_ref", False, 0.6),
+    ("_reference", False, 0.65),
+    ("_uuid", False, 0.7),
+    ("_key", False, 0.65),
+    ("", False, 0.3),
+)
+
+# Common ID field names
+_COMMON_ID_FIELDS = frozenset({"id", "uuid", "key", "code"})
+
+# Pattern for ID field detection
+_ID_FIELD_PATTERN = re.compile(r"^(id|uuid|key|code)$", re.IGNORECASE)
+
+# Target names that are common false positives
+_FALSE_POSITIVE_TARGETS = frozenset({"primary", "foreign", "unique", "created", "updated", "parent"})
+
+
+@lru_cache(maxsize=4096)
+def _singularize(name: str) -> str:
+    """
+    Compute singular form of a name, see NameBasedRelationshipStrategy._get_singular_form.
+    
+    Args:
+        name: Name to convert to singular form.
+        
+    Returns:
+        str: Singular form of the name.
+    """
+    name_lower = name.lower()
+    
+    # Regular plurals, only if not too short (this also covers "ies" and "es")
+    if name_lower.endswith("s"):
+        return name_lower[:-1] if len(name_lower) > 3 else name_lower
+    
+    # Special cases
+    if name_lower.endswith("children"):
+        return name_lower[:-8] + "child"
+    if name_lower.endswith("people"):
+        return name_lower[:-6] + "person"
+    
+    return name_lower
+
 
 class NameBasedRelationshipStrategy(RelationshipStrategy):
     """
@@ -26,19 +107,22 @@ class NameBasedRelationshipStrategy(RelationshipStrategy):
     in a "comments" table suggesting a relationship to the "id" field in a "users" table).
     """
     
+    __slots__ = (
+        "foreign_key_patterns",
+        "common_id_fields",
+        "id_field_pattern",
+    )
+    
     def __init__(self):
         """Initialize the name-based relationship detection strategy."""
-        # Compile patterns for foreign key naming conventions
-        self.foreign_key_patterns = self._compile_foreign_key_patterns()
-        
-        # Compile patterns for plural/singular form matching
-        self.plural_patterns = self._compile_plural_patterns()
+        # Patterns for foreign key naming conventions
+        self.foreign_key_patterns = _FOREIGN_KEY_PATTERNS
         
         # Common ID field names
-        self.common_id_fields = {"id", "uuid", "key", "code"}
+        self.common_id_fields = _COMMON_ID_FIELDS
         
         # Pattern for ID field detection
-        self.id_field_pattern = re.compile(r"^(id|uuid|key|code)$", re.IGNORECASE)
+        self.id_field_pattern = _ID_FIELD_PATTERN
         
     def detect(self, schemas: List[SchemaDetails], options: Optional[Dict[str, Any]] = None) -> List[SchemaRelationship]:
         """
@@ -58,17 +142,26 @@ class NameBasedRelationshipStrategy(RelationshipStrategy):
         min_confidence = options.get("min_confidence", 0.5)
         
         # Create schema lookup by ID
-        schema_lookup = {self._get_schema_id(schema): schema for schema in schemas}
+        schema_ids = [self._get_schema_id(schema) for schema in schemas]
+        schema_lookup = dict(zip(schema_ids, schemas))
+        
+        # Index schema IDs by lowercase and singular form for name matching
+        name_index = self._build_name_index(schema_lookup)
+        
+        # ID fields of each schema, keyed by schema object id
+        id_fields = {id(schema): self._find_id_fields(schema) for schema in schemas}
         
-        # Create field index for fast lookups
-        field_index = self._build_field_index(schemas)
+        # Create index of field name references for fast lookups
+        reference_index = self._build_reference_index(schema_lookup)
         
-        # Collect potential relationships
-        potential_relationships: List[Tuple[str, str, List[str], List[str], float, Dict[str, Any]]] = []
+        # Collect potential relationships, keeping each edge once
+        potential_relationships: Dict[
+            Tuple[str, str, str, Tuple[str, ...]],
+            Tuple[str, str, List[str], List[str], float, Dict[str, Any]]
+        ] = {}
         
         # Process each schema to find potential relationships
-        for schema in schemas:
-            schema_id = self._get_schema_id(schema)
+        for schema_id, schema in zip(schema_ids, schemas):
             schema_singular = self._get_singular_form(schema_id)
             
             # Check each field for name-based relationship patterns
@@ -90,18 +183,18 @@ class NameBasedRelationshipStrategy(RelationshipStrategy):
                 
                 # Look for matching target schema
                 target_schema = None
-                for potential_match in self._find_schema_matches(target_schema_name, schema_lookup):
+                for potential_match in self._find_schema_matches(target_schema_name, name_index):
                     target_schema = schema_lookup.get(potential_match)
                     if target_schema:
                         # See if the target schema has ID fields
-                        target_fields = self._find_id_fields(target_schema)
+                        target_fields = id_fields[id(target_schema)]
                         if target_fields:
                             # We found a potential relationship
                             confidence_boost = 0.1 if potential_match == target_schema_name else 0.0
                             relationship_confidence = target_confidence + confidence_boost
                             
                             # Add the potential relationship
-                            potential_relationships.append((
+                            self._add_potential_relationship(potential_relationships, (
                                 schema_id,                # source schema
                                 potential_match,         # target schema
                                 [field.name],            # source fields
@@ -115,36 +208,33 @@ class NameBasedRelationshipStrategy(RelationshipStrategy):
                             ))
             
             # Check for reverse relationships where the schema name is used in other schemas
-            for other_schema_id, other_schema in schema_lookup.items():
-                if other_schema_id == schema_id:
-                    continue
-                
-                # Check if any field in other schema references this schema by name
-                for other_field in other_schema.fields:
-                    # Check if field name contains this schema's name
-                    if self._field_references_schema(other_field.name, schema_id, schema_singular):
-                        # This field might be referencing our schema
-                        target_fields = self._find_id_fields(schema)
-                        if target_fields:
-                            # We found a potential reverse relationship
-                            relationship_confidence = 0.6  # Base confidence for this pattern
-                            
-                            # Add the potential relationship
-                            potential_relationships.append((
-                                other_schema_id,         # source schema
-                                schema_id,               # target schema
-                                [other_field.name],      # source fields
-                                target_fields,           # target fields 
-                                relationship_confidence, # confidence
-                                {                        # metadata
-                                    "detected_by": "schema_reference",
-                                    "field_reference": other_field.name,
-                                    "pattern_match": schema_singular
-                                }
-                            ))
+            referencing_fields = self._find_referencing_fields(
+                reference_index, schema_id, schema_singular)
+            
+            # Fields in other schemas that might be referencing our schema
+            target_fields = id_fields[id(schema)]
+            if referencing_fields and target_fields:
+                for other_schema_id, other_field_name in referencing_fields:
+                    # We found a potential reverse relationship
+                    relationship_confidence = 0.6  # Base confidence for this pattern
+                    
+                    # Add the potential relationship
+                    self._add_potential_relationship(potential_relationships, (
+                        other_schema_id,         # source schema
+                        schema_id,               # target schema
+                        [other_field_name],      # source fields
+                        target_fields,           # target fields 
+                        relationship_confidence, # confidence
+                        {                        # metadata
+                            "detected_by": "schema_reference",
+                            "field_reference": other_field_name,
+                            "pattern_match": schema_singular
+                        }
+                    ))
         
         # Convert potential relationships to actual relationships
-        relationships = self._create_relationships(potential_relationships, schema_lookup, min_confidence)
+        relationships = self._create_relationships(
+            list(potential_relationships.values()), schema_lookup, min_confidence)
         
         logger.info("Detected %d name-based relationships", len(relationships))
         return relationships
@@ -158,63 +248,6 @@ class NameBasedRelationshipStrategy(RelationshipStrategy):
         """
         return 20  # Medium priority, after foreign key strategy
     
-    def _compile_foreign_key_patterns(self) -> List[Tuple[Pattern, float]]:
-        """
-        Compile regex patterns for foreign key naming conventions.
-        
-        Returns:
-            List[Tuple[Pattern, float]]: List of (pattern, confidence) tuples.
-        """
-        patterns = [
-            # Exact match pattern: <table>_id 
-            (re.compile(r"^([a-z0-9_]+)_id$", re.IGNORECASE), 0.7),
-            
-            # Suffix pattern: <table>id 
-            (re.compile(r"^([a-z0-9_]+)id$", re.IGNORECASE), 0.65),
-            
-            # FK pattern: fk_<table>
-            (re.compile(r"^fk_([a-z0-9_]+)$", re.IGNORECASE), 0.75),
-            
-            # Ref pattern: <table>_ref
-            (re.compile(r"^([a-z0-9_]+)_ref$", re.IGNORECASE), 0.6),
-            
-            # Reference pattern: <table>_reference
-            (re.compile(r"^([a-z0-9_]+)_reference$", re.IGNORECASE), 0.65),
-            
-            # UUID pattern: <table>_uuid
-            (re.compile(r"^([a-z0-9_]+)_uuid$", re.IGNORECASE), 0.7),
-            
-            # Key pattern: <table>_key
-            (re.compile(r"^([a-z0-9_]+)_key$", re.IGNORECASE), 0.65),
-            
-            # Simple pattern: <table>
-            (re.compile(r"^([a-z0-9_]+)$", re.IGNORECASE), 0.3),
-        ]
-        return patterns
-    
-    def _compile_plural_patterns(self) -> List[Tuple[Pattern, str]]:
-        """
-        Compile regex patterns for plural/singular form matching.
-        
-        Returns:
-            List[Tuple[Pattern, str]]: List of (pattern, replacement) tuples.
-        """
-        patterns = [
-            # Regular plurals: add 's'
-            (re.compile(r"s$"), ""),
-            
-            # Plurals ending in 'ies': replace with 'y'
-            (re.compile(r"ies$"), "y"),
-            
-            # Plurals ending in 'es': remove 'es'
-            (re.compile(r"es$"), ""),
-            
-            # Special cases
-            (re.compile(r"children$"), "child"),
-            (re.compile(r"people$"), "person"),
-        ]
-        return patterns
-    
     def _get_schema_id(self, schema: SchemaDetails) -> str:
         """
         Get a unique identifier for a schema.
@@ -249,16 +282,7 @@ class NameBasedRelationshipStrategy(RelationshipStrategy):
             bool: True if field name matches foreign key patterns.
         """
         # Check common foreign key patterns
-        if field_name.endswith("_id") or field_name.endswith("Id"):
-            return True
-            
-        if field_name.endswith("_key") or field_name.endswith("Key"):
-            return True
-            
-        if field_name.endswith("_ref") or field_name.endswith("Ref"):
-            return True
-            
-        if field_name.startswith("fk_") or field_name.startswith("FK_"):
+        if field_name.endswith(_FOREIGN_KEY_SUFFIXES) or field_name.startswith(_FOREIGN_KEY_PREFIXES):
             return True
             
         # Check if field name is simply another table name
@@ -275,6 +299,47 @@ class NameBasedRelationshipStrategy(RelationshipStrategy):
             field_name: Field name to analyze.
             source_schema_id: ID of the source schema.
             
+        Returns:
+            Optional[Tuple[str, float]]: Tuple of (target_schema_name, confidence) if found.
+        """
+        source_schema_lower = source_schema_id.lower()
+        
+        # Names made of [A-Za-z0-9_] only can be sliced by affix instead of
+        # running each pattern
+        if not (field_name.isascii() and field_name.replace("_", "a").isalnum()):
+            return self._match_target_patterns(field_name, source_schema_lower)
+        
+        name_lower = field_name.lower()
+        name_length = len(name_lower)
+        
+        # Try each affix, in pattern order
+        for affix, is_prefix, confidence in _FOREIGN_KEY_AFFIXES:
+            affix_length = len(affix)
+            if name_length <= affix_length:
+                continue
+            
+            if is_prefix:
+                if not name_lower.startswith(affix):
+                    continue
+                target_name = name_lower[affix_length:]
+            else:
+                if not name_lower.endswith(affix):
+                    continue
+                target_name = name_lower[:name_length - affix_length]
+            
+            if self._is_valid_target(target_name, field_name, source_schema_lower):
+                return target_name, confidence
+        
+        return None
+    
+    def _match_target_patterns(self, field_name: str, source_schema_lower: str) -> Optional[Tuple[str, float]]:
+        """
+        Extract potential target schema name from field name using the foreign key patterns.
+        
+        Args:
+            field_name: Field name to analyze.
+            source_schema_lower: Lowercased ID of the source schema.
+            
         Returns:
             Optional[Tuple[str, float]]: Tuple of (target_schema_name, confidence) if found.
         """
@@ -283,19 +348,33 @@ class NameBasedRelationshipStrategy(RelationshipStrategy):
             match = pattern.match(field_name)
             if match:
                 target_name = match.group(1).lower()
-                
-                # Ignore common false positives
-                if target_name in {"primary", "foreign", "unique", "created", "updated", "parent"}:
-                    continue
-                
-                # Ignore self-references unless explicitly named
-                if target_name == source_schema_id.lower() and not field_name.endswith("_parent_id"):
-                    continue
-                
-                return target_name, confidence
+                if self._is_valid_target(target_name, field_name, source_schema_lower):
+                    return target_name, confidence
         
         return None
     
+    def _is_valid_target(self, target_name: str, field_name: str, source_schema_lower: str) -> bool:
+        """
+        Check if a target name extracted from a field name should be used.
+        
+        Args:
+            target_name: Lowercased target schema name.
+            field_name: Field name the target was extracted from.
+            source_schema_lower: Lowercased ID of the source schema.
+            
+        Returns:
+            bool: True if the target name is usable.
+        """
+        # Ignore common false positives
+        if target_name in _FALSE_POSITIVE_TARGETS:
+            return False
+        
+        # Ignore self-references unless explicitly named
+        if target_name == source_schema_lower and not field_name.endswith("_parent_id"):
+            return False
+        
+        return True
+    
     def _is_explicit_self_reference(self, field_name: str) -> bool:
         """
         Check if a field name explicitly indicates a self-reference.
@@ -319,57 +398,72 @@ class NameBasedRelationshipStrategy(RelationshipStrategy):
         Returns:
             str: Singular form of the name.
         """
-        name_lower = name.lower()
+        return _singularize(name)
+    
+    def _build_name_index(self, schema_lookup: Dict[str, SchemaDetails]) -> Dict[str, Any]:
+        """
+        Build an index of schema IDs for matching target names.
         
-        # Try each pattern
-        for pattern, replacement in self.plural_patterns:
-            if pattern.search(name_lower):
-                singular = pattern.sub(replacement, name_lower)
-                # Only return if actually changed and not too short
-                if singular != name_lower and len(singular) > 2:
-                    return singular
+        Args:
+            schema_lookup: Dictionary of schema_id -> schema.
+            
+        Returns:
+            Dict[str, Any]: Schema IDs, their positions by lowercase and by singular
+                form, (position, lowercase) of IDs longer than 3 characters, and
+                the matches found so far by target name.
+        """
+        schema_ids = list(schema_lookup)
+        lower_positions: Dict[str, List[int]] = defaultdict(list)
+        singular_positions: Dict[str, List[int]] = defaultdict(list)
+        long_names: List[Tuple[int, str]] = []
         
-        return name_lower
+        for position, schema_id in enumerate(schema_ids):
+            schema_id_lower = schema_id.lower()
+            lower_positions[schema_id_lower].append(position)
+            singular_positions[self._get_singular_form(schema_id)].append(position)
+            if len(schema_id_lower) > 3:
+                long_names.append((position, schema_id_lower))
+        
+        return {
+            "schema_ids": schema_ids,
+            "lower": lower_positions,
+            "singular": singular_positions,
+            "long_names": long_names,
+            "matches": {},
+        }
     
-    def _find_schema_matches(self, target_name: str, schema_lookup: Dict[str, SchemaDetails]) -> List[str]:
+    def _find_schema_matches(self, target_name: str, name_index: Dict[str, Any]) -> List[str]:
         """
         Find schemas that match the target name.
         
         Args:
             target_name: Target schema name to match.
-            schema_lookup: Dictionary of schema_id -> schema.
+            name_index: Schema name index built by _build_name_index.
             
         Returns:
-            List[str]: List of matching schema IDs.
+            List[str]: List of matching schema IDs, in schema order.
         """
-        matches = []
+        matches = name_index["matches"].get(target_name)
+        if matches is not None:
+            return matches
+        
         target_singular = self._get_singular_form(target_name)
+        lower_positions = name_index["lower"]
         
-        for schema_id in schema_lookup:
-            schema_id_lower = schema_id.lower()
-            schema_singular = self._get_singular_form(schema_id)
-            
-            # Exact match
-            if schema_id_lower == target_name:
-                matches.append(schema_id)
-                continue
-            
-            # Singular match
-            if schema_singular == target_singular:
-                matches.append(schema_id)
-                continue
-            
-            # Plural match
-            if schema_id_lower == target_singular + "s":
-                matches.append(schema_id)
-                continue
-            
-            # Partial match (only for longer names)
-            if len(target_name) > 3 and len(schema_id_lower) > 3:
+        # Exact, singular and plural matches
+        positions = set(lower_positions.get(target_name, ()))
+        positions.update(name_index["singular"].get(target_singular, ()))
+        positions.update(lower_positions.get(target_singular + "s", ()))
+        
+        # Partial match (only for longer names)
+        if len(target_name) > 3:
+            for position, schema_id_lower in name_index["long_names"]:
                 if target_name in schema_id_lower or schema_id_lower in target_name:
-                    matches.append(schema_id)
-                    continue
+                    positions.add(position)
         
+        schema_ids = name_index["schema_ids"]
+        matches = [schema_ids[position] for position in sorted(positions)]
+        name_index["matches"][target_name] = matches
         return matches
     
     def _find_id_fields(self, schema: SchemaDetails) -> List[str]:
@@ -411,63 +505,116 @@ class NameBasedRelationshipStrategy(RelationshipStrategy):
         
         return id_fields
     
-    def _field_references_schema(self, field_name: str, schema_id: str, schema_singular: str) -> bool:
+    def _add_potential_relationship(
+        self,
+        potential_relationships: Dict[
+            Tuple[str, str, str, Tuple[str, ...]],
+            Tuple[str, str, List[str], List[str], float, Dict[str, Any]]
+        ],
+        potential_relationship: Tuple[str, str, List[str], List[str], float, Dict[str, Any]]
+    ) -> None:
+        """
+        Add a potential relationship unless a better one for the same edge was found.
+        
+        An edge is identified by source schema, target schema, source field and
+        target fields; target fields are part of it since schemas sharing an ID may
+        differ in them. Of duplicate edges, the one with the higher base confidence
+        is kept, and a name pattern match on equal confidence. Name pattern matches
+        gain at most 0.15 from naming adjustments, and their base confidence is either
+        at least the 0.6 of schema references or at most 0.4, so this keeps the
+        duplicate with the highest final confidence.
+        
+        Args:
+            potential_relationships: Potential relationships by edge, updated in place.
+            potential_relationship: Potential relationship to add.
+        """
+        source_id, target_id, source_fields, target_fields, confidence, metadata = potential_relationship
+        key = (source_id, target_id, source_fields[0], tuple(target_fields))
+        
+        existing = potential_relationships.get(key)
+        if existing is not None:
+            if confidence < existing[4]:
+                return
+            if confidence == existing[4] and (
+                existing[5]["detected_by"] == "name_pattern" or metadata["detected_by"] != "name_pattern"
+            ):
+                return
+        
+        potential_relationships[key] = potential_relationship
+    
+    def _build_reference_index(
+        self, schema_lookup: Dict[str, SchemaDetails]
+    ) -> Tuple[Dict[str, List[Tuple[int, str, str]]], ...]:
         """
-        Check if a field name references a schema by name.
+        Build inverted indexes of the schema names that field names may reference.
+        
+        A field references a schema name when the lowercased field name starts with
+        "<name>_", ends with "_<name>" or equals "<name>id", where the name is the
+        lowercased schema ID or its singular form. Each index maps such a name to
+        the fields referencing it.
         
         Args:
-            field_name: Field name to check.
-            schema_id: Schema ID to look for.
-            schema_singular: Singular form of schema ID.
+            schema_lookup: Dictionary of schema_id -> schema.
             
         Returns:
-            bool: True if field name references the schema.
+            Tuple[Dict[str, List[Tuple[int, str, str]]], ...]: Prefix, suffix and "id"
+                stem indexes, mapping names to (position, schema_id, field_name) entries.
         """
-        field_lower = field_name.lower()
-        schema_lower = schema_id.lower()
+        prefix_index: Dict[str, List[Tuple[int, str, str]]] = defaultdict(list)
+        suffix_index: Dict[str, List[Tuple[int, str, str]]] = defaultdict(list)
+        id_stem_index: Dict[str, List[Tuple[int, str, str]]] = defaultdict(list)
         
-        # Check common foreign key patterns
-        if f"{schema_singular}_id" == field_lower or f"{schema_lower}_id" == field_lower:
-            return True
-            
-        if field_lower.startswith(f"{schema_singular}_") or field_lower.startswith(f"{schema_lower}_"):
-            return True
-            
-        if field_lower.endswith(f"_{schema_singular}") or field_lower.endswith(f"_{schema_lower}"):
-            return True
-            
-        if f"{schema_singular}id" == field_lower or f"{schema_lower}id" == field_lower:
-            return True
-            
-        return False
+        position = 0
+        for schema_id, schema in schema_lookup.items():
+            for field in schema.fields:
+                entry = (position, schema_id, field.name)
+                position += 1
+                
+                field_lower = field.name.lower()
+                
+                # Every underscore splits the name into a referenced prefix and suffix
+                underscore = field_lower.find("_")
+                while underscore != -1:
+                    prefix_index[field_lower[:underscore]].append(entry)
+                    suffix_index[field_lower[underscore + 1:]].append(entry)
+                    underscore = field_lower.find("_", underscore + 1)
+                
+                if field_lower.endswith("id"):
+                    id_stem_index[field_lower[:-2]].append(entry)
+        
+        return prefix_index, suffix_index, id_stem_index
     
-    def _build_field_index(self, schemas: List[SchemaDetails]) -> Dict[str, Dict[str, List[str]]]:
+    def _find_referencing_fields(
+        self,
+        reference_index: Tuple[Dict[str, List[Tuple[int, str, str]]], ...],
+        schema_id: str,
+        schema_singular: str
+    ) -> List[Tuple[str, str]]:
         """
-        Build index of field names across schemas for fast lookups.
+        Find fields in other schemas that reference a schema by name.
         
         Args:
-            schemas: List of schema details.
+            reference_index: Indexes built by _build_reference_index.
+            schema_id: Schema ID to look for.
+            schema_singular: Singular form of schema ID.
             
         Returns:
-            Dict[str, Dict[str, List[str]]]: Index of field names.
+            List[Tuple[str, str]]: (schema_id, field_name) of referencing fields,
+                in schema and field order.
         """
-        index: Dict[str, Dict[str, List[str]]] = {}
+        names = {schema_id.lower(), schema_singular}
         
-        for schema in schemas:
-            schema_id = self._get_schema_id(schema)
-            
-            for field in schema.fields:
-                field_lower = field.name.lower()
-                
-                if field_lower not in index:
-                    index[field_lower] = {}
-                    
-                if schema_id not in index[field_lower]:
-                    index[field_lower][schema_id] = []
-                    
-                index[field_lower][schema_id].append(field.name)
+        matches: Dict[int, Tuple[int, str, str]] = {}
+        for index in reference_index:
+            for name in names:
+                for entry in index.get(name, ()):
+                    matches[entry[0]] = entry
         
-        return index
+        return [
+            (other_schema_id, field_name)
+            for _, other_schema_id, field_name in sorted(matches.values())
+            if other_schema_id != schema_id
+        ]
     
     def _create_relationships(
         self,
@@ -488,6 +635,9 @@ class NameBasedRelationshipStrategy(RelationshipStrategy):
         """
         relationships = []
         
+        # Field indexes of source and target schemas, keyed by schema object id
+        field_indexes: Dict[int, Dict[str, Tuple[int, FieldInfo]]] = {}
+        
         # Process each potential relationship
         for source_id, target_id, source_fields, target_fields, base_confidence, metadata in potential_relationships:
             # Skip if source or target schema is not in lookup
@@ -501,15 +651,24 @@ class NameBasedRelationshipStrategy(RelationshipStrategy):
             # Adjust confidence based on schema and field metadata
             confidence_factors = {"base_confidence": base_confidence}
             
+            source_field_index = self._get_field_index(source_schema, field_indexes)
+            target_field_index = self._get_field_index(target_schema, field_indexes)
+            
+            # First target field (in schema order) that is one of the target fields
+            target_field_entries = [
+                target_field_index[name] for name in target_fields if name in target_field_index
+            ]
+            target_field = min(target_field_entries, key=lambda entry: entry[0])[1] if target_field_entries else None
+            
             # Check if source field is explicitly marked as foreign key
             for field_name in source_fields:
-                field = next((f for f in source_schema.fields if f.name == field_name), None)
-                if field:
+                field_entry = source_field_index.get(field_name)
+                if field_entry:
+                    field = field_entry[1]
                     if field.metadata.get("foreign_key") or field.metadata.get("references"):
                         confidence_factors["explicit_fk_metadata"] = 0.2
                         
                     # Check if field type matches target field type
-                    target_field = next((f for f in target_schema.fields if f.name in target_fields), None)
                     if target_field and field.data_type == target_field.data_type:
                         confidence_factors["type_match"] = 0.1
             
@@ -558,6 +717,28 @@ class NameBasedRelationshipStrategy(RelationshipStrategy):
         
         return relationships
     
+    def _get_field_index(
+        self, schema: SchemaDetails, field_indexes: Dict[int, Dict[str, Tuple[int, FieldInfo]]]
+    ) -> Dict[str, Tuple[int, FieldInfo]]:
+        """
+        Get the field index of a schema, building it on first use.
+        
+        Args:
+            schema: Schema details.
+            field_indexes: Cache of field indexes, keyed by schema object id.
+            
+        Returns:
+            Dict[str, Tuple[int, FieldInfo]]: (position, field) by field name, first
+                field wins for duplicate names.
+        """
+        field_index = field_indexes.get(id(schema))
+        if field_index is None:
+            field_index = {}
+            for position, field in enumerate(schema.fields):
+                field_index.setdefault(field.name, (position, field))
+            field_indexes[id(schema)] = field_index
+        return field_index
+    
     def _determine_relationship_type(
         self, 
         source_schema: SchemaDetails, 
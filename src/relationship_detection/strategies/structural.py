@@ -26,6 +26,8 @@ class StructuralSimilarityStrategy(RelationshipStrategy):
     patterns, and constraints.
     """
     
+    __slots__ = ()
+    
     def detect(self, schemas: List[SchemaDetails], options: Optional[Dict[str, Any]] = None) -> List[SchemaRelationship]:
         """
         Detect relationships based on structural similarity.
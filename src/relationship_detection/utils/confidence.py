@@ -1,8 +1,11 @@
 """
 Utility functions for calculating confidence and validating relationships.
 """
+import heapq
 import logging
-from typing import Any, Dict, List, Optional, Set, Tuple
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Union
 
 from src.format_detection.models import SchemaDetails
 from src.relationship_detection.models import (
@@ -161,7 +164,8 @@ def determine_relationship_direction(
 
 def consolidate_relationships(
     relationships: List[SchemaRelationship],
-    confidence_threshold: float = 0.5
+    confidence_threshold: float = 0.5,
+    max_relationships: Optional[int] = None
 ) -> List[SchemaRelationship]:
     """
     Consolidate and filter relationships.
@@ -169,9 +173,10 @@ def consolidate_relationships(
     Args:
         relationships: List of detected relationships.
         confidence_threshold: Minimum confidence threshold.
+        max_relationships: Optional maximum number of relationships to keep.
         
     Returns:
-        List[SchemaRelationship]: Consolidated relationships.
+        List[SchemaRelationship]: Consolidated relationships, highest confidence first.
     """
     if not relationships:
         return []
@@ -179,17 +184,26 @@ def consolidate_relationships(
     # Filter by confidence
     filtered = [r for r in relationships if r.confidence.score >= confidence_threshold]
     
+    # Schema pairs linked by a bidirectional relationship are grouped without
+    # direction, so that A->B and B->A are merged together
+    bidirectional_pairs = {
+        frozenset((rel.source_schema, rel.target_schema))
+        for rel in filtered if rel.bidirectional
+    }
+    
     # Group by source and target schema
-    grouped: Dict[Tuple[str, str], List[SchemaRelationship]] = {}
+    grouped: Dict[Union[Tuple[str, str], FrozenSet[str]], List[SchemaRelationship]] = defaultdict(list)
     for rel in filtered:
         key = (rel.source_schema, rel.target_schema)
-        if key not in grouped:
-            grouped[key] = []
+        if bidirectional_pairs:
+            pair = frozenset(key)
+            if pair in bidirectional_pairs:
+                key = pair
         grouped[key].append(rel)
     
     # Consolidate each group
     consolidated = []
-    for (source, target), group in grouped.items():
+    for group in grouped.values():
         if len(group) == 1:
             # Only one relationship, keep as is
             consolidated.append(group[0])
@@ -197,12 +211,34 @@ def consolidate_relationships(
             # Multiple relationships, consolidate
             consolidated.append(_merge_relationships(group))
     
+    # Keep only the top relationships if limited; nlargest selects them
+    # without sorting the whole list, and keeps ties in original order
+    if max_relationships is not None and len(consolidated) > max_relationships:
+        logger.warning("Limiting relationships to %d (from %d)", 
+                     max_relationships, len(consolidated))
+        return heapq.nlargest(max_relationships, consolidated, 
+                              key=lambda r: r.confidence.score)
+    
     # Sort by confidence score (highest first)
     consolidated.sort(key=lambda r: r.confidence.score, reverse=True)
     
     return consolidated
 
 
+@lru_cache(maxsize=128)
+def _join_detection_methods(detection_methods: FrozenSet[str]) -> str:
+    """
+    Join detection methods into a canonical, sorted description.
+    
+    Args:
+        detection_methods: Detection methods of the merged relationships.
+        
+    Returns:
+        str: Comma-separated detection methods.
+    """
+    return ", ".join(sorted(detection_methods))
+
+
 def _merge_relationships(relationships: List[SchemaRelationship]) -> SchemaRelationship:
     """
     Merge multiple relationships between the same schemas.
@@ -216,12 +252,13 @@ def _merge_relationships(relationships: List[SchemaRelationship]) -> SchemaRelat
     # Select the highest confidence relationship as base
     base = max(relationships, key=lambda r: r.confidence.score)
     
-    # Collect all confidence factors
-    all_factors: Dict[str, List[float]] = {}
+    # Collect all confidence factors and detection methods in one pass
+    all_factors: Dict[str, List[float]] = defaultdict(list)
+    detection_methods: Set[str] = set()
     for rel in relationships:
-        for factor, value in rel.confidence.factors.items():
-            if factor not in all_factors:
-                all_factors[factor] = []
+        confidence = rel.confidence
+        detection_methods.add(confidence.detection_method)
+        for factor, value in confidence.factors.items():
             all_factors[factor].append(value)
     
     # Average the factors
@@ -229,14 +266,13 @@ def _merge_relationships(relationships: List[SchemaRelationship]) -> SchemaRelat
                      for factor, values in all_factors.items()}
     
     # Add a "multiple_signals" boost if multiple detection methods were used
-    detection_methods = {rel.confidence.detection_method for rel in relationships}
     if len(detection_methods) > 1:
         merged_factors["multiple_signals"] = 0.1 * min(len(detection_methods), 3)
     
     # Create merged confidence
     merged_confidence = calculate_confidence(
         factors=merged_factors,
-        detection_method=", ".join(sorted(detection_methods)),
+        detection_method=_join_detection_methods(frozenset(detection_methods)),
         rationale=f"Merged from {len(relationships)} relationship detections"
     )
     
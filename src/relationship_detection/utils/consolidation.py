@@ -2,6 +2,7 @@
 Utility functions for consolidating and managing relationships.
 """
 import logging
+from collections import defaultdict
 from typing import Any, Dict, List, Optional, Set, Tuple
 
 from src.format_detection.models import SchemaDetails
@@ -31,26 +32,22 @@ def create_schema_coverage_map(relationships: List[SchemaRelationship]) -> Dict[
     Returns:
         Dict[str, List[str]]: Mapping from schema ID to related schemas.
     """
-    coverage: Dict[str, Set[str]] = {}
+    coverage: Dict[str, Set[str]] = defaultdict(set)
     
     for rel in relationships:
         source = rel.source_schema
         target = rel.target_schema
         
         # Add source -> target
-        if source not in coverage:
-            coverage[source] = set()
         coverage[source].add(target)
         
         # Add target -> source for bidirectional relationships
         if rel.bidirectional:
-            if target not in coverage:
-                coverage[target] = set()
             coverage[target].add(source)
     
     # Convert sets to sorted lists for consistent output
     return {
-        schema: sorted(list(related))
+        schema: sorted(related)
         for schema, related in coverage.items()
     }
 
@@ -142,12 +139,9 @@ def create_relationship_store(
     }
     
     # Add confidence by type
-    by_type: Dict[str, List[float]] = {}
+    by_type: Dict[str, List[float]] = defaultdict(list)
     for rel in consolidated:
-        rel_type = rel.relationship_type.value
-        if rel_type not in by_type:
-            by_type[rel_type] = []
-        by_type[rel_type].append(rel.confidence.score)
+        by_type[rel.relationship_type.value].append(rel.confidence.score)
     
     confidence_summary["by_type"] = {
         rel_type: sum(scores) / len(scores)
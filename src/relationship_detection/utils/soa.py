@@ -0,0 +1,100 @@
+"""
+Struct-of-arrays views of relationships for batch statistics.
+"""
+import logging
+from typing import Any, Dict, List
+
+import numpy as np
+
+from src.relationship_detection.models import RelationshipType, SchemaRelationship
+
+
+logger = logging.getLogger(__name__)
+
+
+class RelationshipArrays:
+    """Relationships packed into parallel arrays, one entry per relationship."""
+
+    __slots__ = ("scores", "types", "type_names")
+
+    def __init__(self, scores: np.ndarray, types: np.ndarray, type_names: List[str]):
+        """
+        Initialize the packed relationship arrays.
+
+        Args:
+            scores: Confidence scores (float64).
+            types: Relationship type codes (int32), indexing type_names.
+            type_names: Relationship type values, in order of first occurrence.
+        """
+        self.scores = scores
+        self.types = types
+        self.type_names = type_names
+
+    def __len__(self) -> int:
+        """
+        Get the number of packed relationships.
+
+        Returns:
+            int: Number of relationships.
+        """
+        return len(self.scores)
+
+
+def pack_relationships(relationships: List[SchemaRelationship]) -> RelationshipArrays:
+    """
+    Pack relationships into parallel arrays.
+
+    Relationship types are encoded as integer codes, assigned in order of
+    first occurrence.
+
+    Args:
+        relationships: List of relationships.
+
+    Returns:
+        RelationshipArrays: Packed relationships.
+    """
+    count = len(relationships)
+    type_codes: Dict[RelationshipType, int] = {}
+
+    scores = np.fromiter(
+        (rel.confidence.score for rel in relationships), dtype=np.float64, count=count
+    )
+    types = np.fromiter(
+        (type_codes.setdefault(rel.relationship_type, len(type_codes)) for rel in relationships),
+        dtype=np.int32,
+        count=count,
+    )
+
+    return RelationshipArrays(
+        scores=scores,
+        types=types,
+        type_names=[rel_type.value for rel_type in type_codes],
+    )
+
+
+def summarize_confidence(arrays: RelationshipArrays) -> Dict[str, Any]:
+    """
+    Calculate confidence summary statistics from packed relationships.
+
+    Args:
+        arrays: Packed relationships.
+
+    Returns:
+        Dict[str, Any]: Mean, min and max confidence, and mean confidence by type.
+    """
+    if not len(arrays):
+        return {"mean": 0.0, "min": 0.0, "max": 0.0, "by_type": {}}
+
+    scores = arrays.scores
+    type_sums = np.bincount(arrays.types, weights=scores)
+    type_counts = np.bincount(arrays.types)
+
+    return {
+        "mean": float(scores.mean()),
+        "min": float(scores.min()),
+        "max": float(scores.max()),
+        "by_type": {
+            rel_type: float(type_sum / count)
+            for rel_type, type_sum, count in zip(arrays.type_names, type_sums, type_counts)
+        },
+    }
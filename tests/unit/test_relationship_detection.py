@@ -1,6 +1,7 @@
 """
 Unit tests for relationship detection functionality.
 """
+import asyncio
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -10,10 +11,13 @@ from src.relationship_detection.models import (
     RelationshipType,
     SchemaRelationship,
 )
+from src.relationship_detection.strategies.base import RelationshipStrategy
 from src.relationship_detection.strategies.foreign_key import ForeignKeyRelationshipStrategy
 from src.relationship_detection.strategies.name_based import NameBasedRelationshipStrategy
 from src.relationship_detection.service import RelationshipDetectionService
 from src.relationship_detection.utils.comparators import get_schema_id, are_types_compatible
+from src.relationship_detection.utils.confidence import consolidate_relationships
+from src.relationship_detection.utils.soa import pack_relationships, summarize_confidence
 
 
 class TestRelationshipModels(unittest.TestCase):
@@ -163,6 +167,97 @@ class TestRelationshipDetectionService(unittest.TestCase):
         mock_detect.assert_called_once()
 
 
+class TestRelationshipDetectionPipeline(unittest.IsolatedAsyncioTestCase):
+    """Tests for the relationship detection pipeline."""
+    
+    def setUp(self):
+        """Set up the test fixture."""
+        self.service = RelationshipDetectionService()
+        
+        self.user_schema = SchemaDetails(
+            fields=[
+                FieldInfo(name="id", path="id", data_type=DataType.INTEGER),
+                FieldInfo(name="email", path="email", data_type=DataType.STRING),
+            ],
+            primary_keys=["id"],
+            unique_constraints=[["email"]],
+            metadata={"table_name": "users"}
+        )
+        
+        self.post_schema = SchemaDetails(
+            fields=[
+                FieldInfo(name="id", path="id", data_type=DataType.INTEGER),
+                FieldInfo(name="user_id", path="user_id", data_type=DataType.INTEGER),
+            ],
+            primary_keys=["id"],
+            foreign_keys=[
+                {"columns": ["user_id"], "referenced_table": "users", "referenced_columns": ["id"]}
+            ],
+            metadata={"table_name": "posts"}
+        )
+    
+    def test_strategies_have_no_instance_dict(self):
+        """Test that the service and built-in strategies use slots."""
+        self.assertEqual(len(self.service.strategies), 3)
+        self.assertFalse(hasattr(self.service, "__dict__"))
+        for strategy in self.service.strategies:
+            self.assertFalse(hasattr(strategy, "__dict__"), strategy.get_id())
+    
+    async def test_failing_strategy_does_not_stop_detection(self):
+        """Test that an error in one strategy keeps results from the others."""
+        with patch(
+            'src.relationship_detection.strategies.name_based.NameBasedRelationshipStrategy.detect',
+            side_effect=RuntimeError("boom"),
+        ):
+            result = await self.service.detect_relationships(
+                [self.user_schema, self.post_schema], {"enhance_types": False})
+        
+        posts_to_users = [
+            r for r in result.relationships
+            if r.source_schema == "posts" and r.target_schema == "users"
+        ]
+        self.assertEqual(len(posts_to_users), 1)
+        self.assertEqual(posts_to_users[0].source_fields, ["user_id"])
+    
+    async def test_cancelled_strategy_cancels_detection(self):
+        """Test that cancellation inside a strategy is propagated, not treated as a failure."""
+        with patch(
+            'src.relationship_detection.strategies.name_based.NameBasedRelationshipStrategy.detect',
+            side_effect=asyncio.CancelledError(),
+        ):
+            with self.assertRaises(asyncio.CancelledError):
+                await self.service.detect_relationships(
+                    [self.user_schema, self.post_schema], {"enhance_types": False})
+    
+    async def test_streaming_strategy(self):
+        """Test that relationships yielded by a strategy are filtered as consumed."""
+        class StreamingStrategy(RelationshipStrategy):
+            def detect(self, schemas, options=None):
+                return list(self.detect_stream(schemas, options))
+            
+            def detect_stream(self, schemas, options=None):
+                for score in (0.9, 0.2):
+                    yield SchemaRelationship(
+                        source_schema="tags",
+                        target_schema="posts",
+                        source_fields=["post_id"],
+                        target_fields=["id"],
+                        relationship_type=RelationshipType.REFERENCE,
+                        confidence=RelationshipConfidence(score=score, detection_method="streaming"),
+                    )
+            
+            def get_priority(self):
+                return 100
+        
+        self.service.register_strategy(StreamingStrategy())
+        result = await self.service.detect_relationships(
+            [self.user_schema, self.post_schema], {"enhance_types": False})
+        
+        streamed = [r for r in result.relationships if r.source_schema == "tags"]
+        self.assertEqual(len(streamed), 1)
+        self.assertEqual(streamed[0].confidence.score, 0.9)
+
+
 class TestRelationshipStrategies(unittest.TestCase):
     """Tests for relationship detection strategies."""
     
@@ -252,6 +347,58 @@ class TestRelationshipStrategies(unittest.TestCase):
             self.assertTrue("post_id" in relationship.target_fields)
 
 
+class TestNameBasedStrategy(unittest.TestCase):
+    """Tests for NameBasedRelationshipStrategy."""
+    
+    def test_reports_each_edge_once(self):
+        """Test that an edge found by both name-based checks is reported once, as a name pattern."""
+        users = SchemaDetails(
+            fields=[FieldInfo(name="id", path="id", data_type=DataType.INTEGER)],
+            primary_keys=["id"],
+            metadata={"table_name": "users"}
+        )
+        posts = SchemaDetails(
+            fields=[
+                FieldInfo(name="id", path="id", data_type=DataType.INTEGER),
+                FieldInfo(name="user_id", path="user_id", data_type=DataType.INTEGER)
+            ],
+            primary_keys=["id"],
+            metadata={"table_name": "posts"}
+        )
+        
+        # Users first, so the reverse check sees the edge before the forward one
+        relationships = NameBasedRelationshipStrategy().detect([users, posts])
+        
+        edges = [r for r in relationships if r.source_fields == ["user_id"]]
+        self.assertEqual(len(edges), 1)
+        self.assertEqual(edges[0].target_schema, "users")
+        self.assertEqual(edges[0].metadata["detected_by"], "name_pattern")
+    
+    def test_keeps_the_more_confident_duplicate_edge(self):
+        """Test that a schema reference is kept over a weaker name pattern match of the same edge."""
+        user = SchemaDetails(
+            fields=[FieldInfo(name="id", path="id", data_type=DataType.INTEGER)],
+            primary_keys=["id"],
+            metadata={"table_name": "user"}
+        )
+        posts = SchemaDetails(
+            fields=[
+                FieldInfo(name="id", path="id", data_type=DataType.INTEGER),
+                FieldInfo(name="user_keyRef", path="user_keyRef", data_type=DataType.INTEGER)
+            ],
+            primary_keys=["id"],
+            metadata={"table_name": "posts"}
+        )
+        
+        # "user_keyRef" only matches "user" as a plain name, which scores below the threshold
+        relationships = NameBasedRelationshipStrategy().detect([posts, user])
+        
+        edges = [r for r in relationships if r.source_fields == ["user_keyRef"]]
+        self.assertEqual(len(edges), 1)
+        self.assertEqual(edges[0].target_schema, "user")
+        self.assertEqual(edges[0].metadata["detected_by"], "schema_reference")
+
+
 class TestUtilityFunctions(unittest.TestCase):
     """Tests for utility functions in the relationship_detection module."""
     
@@ -292,6 +439,56 @@ class TestUtilityFunctions(unittest.TestCase):
         # Incompatible types
         self.assertFalse(are_types_compatible(DataType.INTEGER, DataType.STRING))
         self.assertFalse(are_types_compatible(DataType.BOOLEAN, DataType.DATE))
+    
+    def test_consolidate_bidirectional_relationships(self):
+        """Test that A->B and B->A are merged when bidirectional."""
+        def relationship(source, target, score, method):
+            return SchemaRelationship(
+                source_schema=source,
+                target_schema=target,
+                source_fields=["id"],
+                target_fields=["id"],
+                relationship_type=RelationshipType.ONE_TO_ONE,
+                confidence=RelationshipConfidence(score=score, factors={"match": score},
+                                                  detection_method=method),
+                bidirectional=True,
+            )
+        
+        consolidated = consolidate_relationships([
+            relationship("users", "profiles", 0.8, "foreign_key"),
+            relationship("profiles", "users", 0.6, "name_based"),
+        ])
+        
+        self.assertEqual(len(consolidated), 1)
+        self.assertEqual(consolidated[0].source_schema, "users")
+        self.assertEqual(consolidated[0].metadata["merged_from"], 2)
+    
+    def test_summarize_confidence(self):
+        """Test confidence summary over packed relationships."""
+        relationships = [
+            SchemaRelationship(
+                source_schema="posts",
+                target_schema="users",
+                source_fields=["user_id"],
+                target_fields=["id"],
+                relationship_type=rel_type,
+                confidence=RelationshipConfidence(score=score),
+            )
+            for rel_type, score in [
+                (RelationshipType.MANY_TO_ONE, 0.9),
+                (RelationshipType.ONE_TO_ONE, 0.5),
+                (RelationshipType.MANY_TO_ONE, 0.7),
+            ]
+        ]
+        
+        summary = summarize_confidence(pack_relationships(relationships))
+        
+        self.assertAlmostEqual(summary["mean"], 0.7)
+        self.assertEqual(summary["min"], 0.5)
+        self.assertEqual(summary["max"], 0.9)
+        self.assertEqual(list(summary["by_type"]), ["many_to_one", "one_to_one"])
+        self.assertAlmostEqual(summary["by_type"]["many_to_one"], 0.8)
+        self.assertEqual(summarize_confidence(pack_relationships([]))["by_type"], {})
 
 
 if __name__ == "__main__":
@@ -120,6 +120,59 @@ class TestTypeInferenceService:
         assert 'type_confidence' in enhanced_schema.metadata
         assert 'type_inference_version' in enhanced_schema.metadata
 
+    def test_enhance_schema_in_place(self):
+        """Test enhancing a schema in place."""
+        service = TypeInferenceService()
+
+        schema = create_test_schema()
+        copied_schema = service.enhance_schema(create_test_schema())
+        enhanced_schema = service.enhance_schema(schema, in_place=True)
+
+        assert enhanced_schema is schema
+        assert enhanced_schema == copied_schema
+        assert all('enhanced_type' in field.metadata for field in schema.fields)
+
+    def test_inference_cache(self):
+        """Test reuse of inferred types for fields with the same signature."""
+        service = TypeInferenceService()
+
+        field = create_test_field("user_id", "a.user_id", DataType.STRING, ["1", "2"])
+        same_field = create_test_field("user_id", "b.user_id", DataType.STRING, ["1", "2"])
+        first = service.infer_field_type(field, {})
+        second = service.infer_field_type(same_field, {})
+
+        # Cached results are equal but never shared between fields
+        assert second == first
+        assert second is not first
+        assert second.confidence is not first.confidence
+        assert len(service._inference_cache) == 1
+
+        # Different sample values produce a separate entry
+        other_field = create_test_field("user_id", "c.user_id", DataType.STRING, ["3"])
+        service.infer_field_type(other_field, {})
+        assert len(service._inference_cache) == 2
+
+        # Registering an enhancer invalidates cached results
+        service.register_enhancer(NameBasedEnhancer())
+        assert len(service._inference_cache) == 0
+
+    def test_enhance_batch(self):
+        """Test batch enhancement matches per-field enhancement."""
+        service = TypeInferenceService()
+        fields = create_test_schema().fields
+
+        batch_types = service._infer_field_types(fields, {})
+        service.clear_cache()
+        single_types = [service.infer_field_type(field, {}) for field in fields]
+
+        assert batch_types == single_types
+
+        # Fields sharing a signature get equal but separate results
+        duplicates = [fields[0], fields[0].model_copy(update={"path": "other.user_id"})]
+        first, second = service._infer_field_types(duplicates, {})
+        assert first == second
+        assert first is not second
+
     def test_name_based_enhancement(self):
         """Test name-based type enhancement."""
         class TestService(TypeInferenceService):
@@ -210,6 +263,63 @@ class TestTypeInferenceService:
         assert enhanced.properties["name"].primary_type == DataType.STRING
         assert enhanced.properties["value"].primary_type == DataType.INTEGER
 
+    def test_map_key_detection(self):
+        """Test detection of map-like objects from property names."""
+        class TestService(TypeInferenceService):
+            def _register_enhancers(self):
+                # Override to only register complex structure enhancer
+                self.register_enhancer(ComplexStructureEnhancer())
+
+        service = TestService()
+
+        # Numeric keys suggest a map keyed by integers
+        field = create_test_field(
+            "scores", "scores", DataType.OBJECT,
+            [{"1": 10, "2": 20, "-3": 30}, {"4": 40, "5": 50}]
+        )
+        enhanced = service.infer_field_type(field, {})
+
+        assert enhanced.metadata.get("potential_map") is True
+        assert enhanced.key_type.primary_type == DataType.INTEGER
+        assert enhanced.value_type.primary_type == DataType.INTEGER
+
+        # Keys are numeric whenever int()/float() accept them
+        field = create_test_field(
+            "padded", "padded", DataType.OBJECT,
+            [{" 1 ": 10, "1_000": 20, "+3": 30}, {"4": 40, "5\n": 50}]
+        )
+        enhanced = service.infer_field_type(field, {})
+
+        assert enhanced.key_type.primary_type == DataType.INTEGER
+
+        field = create_test_field(
+            "ratios", "ratios", DataType.OBJECT,
+            [{"0.5": 1, "nan": 2, "inf": 3}, {"-Infinity": 4, "1e3": 5}]
+        )
+        enhanced = service.infer_field_type(field, {})
+
+        assert enhanced.key_type.primary_type == DataType.FLOAT
+
+        # UUID keys suggest a map keyed by UUID strings
+        field = create_test_field(
+            "by_uuid", "by_uuid", DataType.OBJECT,
+            [{f"123e4567-e89b-12d3-a456-42661417400{i}": "x" for i in range(5)}]
+        )
+        enhanced = service.infer_field_type(field, {})
+
+        assert enhanced.key_type.primary_type == DataType.STRING
+        assert TypePattern.UUID in enhanced.key_type.patterns
+
+        # Mixed key types should not be treated as a map
+        field = create_test_field(
+            "mixed", "mixed", DataType.OBJECT,
+            [{"1": 10, "2.5": 20, "name": "x", "4": 40, "5": 50}]
+        )
+        enhanced = service.infer_field_type(field, {})
+
+        assert enhanced.key_type is None
+        assert "potential_map" not in enhanced.metadata
+
     def test_confidence_scoring(self):
         """Test confidence scoring system."""
         class TestService(TypeInferenceService):
@@ -290,3 +400,34 @@ class TestTypeInferenceService:
         # Check denormalized type
         assert denormalized.primary_type == DataType.OBJECT
         assert "id" in denormalized.properties
+
+    def test_deep_type_normalization(self):
+        """Test normalization of types nested beyond the recursion limit."""
+        service = TypeInferenceService()
+        confidence = TypeConfidence(
+            score=0.9,
+            factors={"test": 0.9},
+            rationale="Test rationale",
+            detection_method="test",
+        )
+
+        type_info = EnhancedTypeInfo(primary_type=DataType.STRING, confidence=confidence)
+        depth = 2000
+        for _ in range(depth):
+            type_info = EnhancedTypeInfo(
+                primary_type=DataType.ARRAY,
+                confidence=confidence,
+                item_type=type_info,
+            )
+
+        normalized = service.normalize_type(type_info, "test-format")
+        denormalized = service.denormalize_type(normalized, "other-format")
+
+        # Walk down to the innermost item type
+        nesting = 0
+        while denormalized.item_type is not None:
+            denormalized = denormalized.item_type
+            nesting += 1
+
+        assert nesting == depth
+        assert denormalized.primary_type == DataType.STRING